@@ -1,16 +1,96 @@
-from flask import Flask, render_template, request, redirect, session, url_for, jsonify
-from flask_socketio import SocketIO, join_room, leave_room, emit
-from models import User, Room
+from flask import Flask, Response, render_template, request, redirect, session, url_for, jsonify, stream_with_context
+from flask_socketio import SocketIO
+from models import MAX_CARDS_PER_PLAYER, PRIZE_PATTERNS, User, Room, parse_prize_tiers
+from history import GameHistory, iter_replay, verify_claim
+from assets import AssetPipeline
+from rate_limit import RateLimiter
+from simulator import cached_result, simulate
+from snapshots import cards_snapshot, conditional_response, state_snapshot
+from socket_context import ContextCache
+from export import CARD_EXPORTS, GAME_LOG_EXPORTS
+from tournament import Tournament
+from transport import EventRegistry, current_sid, emit, leave_room, session_username
+from workers import PoolFull, WorkerPool
+import json
 import os
+import threading
+import uuid
 
 app = Flask(__name__)
 app.secret_key = "golden-club-bingo-secret-2024"
 socketio = SocketIO(app, cors_allowed_origins="*")
+events = EventRegistry(socketio)  # Handlers WebSocket, servidos em modo WSGI ou ASGI
+assets = AssetPipeline(app)  # Arquivos estáticos com hash e pré-comprimidos
+limiter = RateLimiter()  # Limite de eventos por conexão
+workers = WorkerPool(events.emit,
+                     io_workers=int(os.environ.get('BINGO_IO_WORKERS', 8)),
+                     cpu_workers=int(os.environ.get('BINGO_CPU_WORKERS', 0)) or None)  # Operações pesadas fora dos handlers
 
 # Armazenamento em memória
 users = {}  # username: User object
 rooms = {}  # room_name: Room object
 user_sessions = {}  # session_id: username
+tournaments = {}  # nome: Tournament
+odds_jobs = {}  # room_name: (job_id, parâmetros, Future) - última simulação de probabilidades da sala
+odds_lock = threading.Lock()
+ODDS_MAX_GAMES = 500000  # Jogos por simulação pedida pela API
+ODDS_MAX_RUNNING = 2  # Simulações em andamento ao mesmo tempo (cada uma ocupa uma thread do pool)
+contexts = ContextCache(users, rooms)  # session_id: (usuário, sala, papel) já resolvidos
+
+# Histórico de jogos finalizados (log binário somente-anexo)
+game_history = GameHistory(os.environ.get('BINGO_HISTORY_PATH', os.path.join('data', 'game_history.bin')))
+
+def schedule_card_pool_refill(room_obj):
+    """Reabastece o pool de cartelas da sala em segundo plano, na fila da sala"""
+    try:
+        # Um reabastecimento ainda na fila já alcança o alvo atualizado
+        workers.submit_room(room_obj.room_name, task_refill_card_pool, room_obj, None, coalesce=True)
+    except PoolFull:
+        pass  # take_card gera na hora se o pool esvaziar
+
+def submit_room_task(ctx, task, *args, error):
+    """Enfileira uma operação pesada da sala no pool; o resultado é emitido ao concluir"""
+    sid = current_sid()
+    try:
+        workers.submit_room(ctx.room_name, task, ctx.room, sid, *args,
+                            on_error=[('error', {'message': error}, sid)])
+    except PoolFull:
+        # `busy` permite ao cliente repetir o pedido (ex.: a entrada na sala)
+        emit('error', {'message': 'Servidor ocupado, tente novamente em instantes', 'busy': True})
+
+def user_sids(username):
+    """Conexões ativas de um usuário"""
+    return [session_id for session_id, name in list(user_sessions.items()) if name == username]
+
+def players_config_messages(room_obj):
+    """Configuração de cartelas e check-ins enviada ao admin após cada alteração"""
+    data = {'players': room_obj.get_player_cards_config()}
+    return [('players_config', data, session_id) for session_id in user_sids(room_obj.admin_username)]
+
+def room_sessions(room_obj):
+    """(session_id, jogador) das conexões ativas na sala"""
+    return [(session_id, users[username]) for session_id, username in list(user_sessions.items())
+            if room_obj.has_player(username)]
+
+def record_game(room_obj):
+    """Grava o jogo atual da sala no histórico, uma única vez por jogo"""
+    if not room_obj.game_started or room_obj.game_recorded:
+        return None
+    room_obj.game_recorded = True
+    return game_history.append(room_obj)
+
+def stream_export(chunks, mimetype, filename):
+    """Resposta HTTP chunked para download, gerada bloco a bloco"""
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    })
+
+def stream_json_lines(items):
+    """Resposta HTTP em JSON Lines gerada item a item"""
+    def generate():
+        for item in items:
+            yield json.dumps(item, ensure_ascii=False) + '\n'
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
 
 @app.route("/")
 def index():
@@ -48,7 +128,12 @@ def logout():
         if username in users:
             user = users[username]
             if user.room and user.room in rooms:
-                rooms[user.room].remove_player(user)
+                room_obj = rooms[user.room]
+                try:
+                    workers.submit_room(room_obj.room_name, task_leave_room, room_obj, None, user)
+                except PoolFull:
+                    # Nunca altera a sala fora da fila dela; o jogador continua na sala
+                    print(f"[DEBUG] Fila da sala {room_obj.room_name} cheia; {username} não foi removido")
         
         session.pop("username", None)
     
@@ -61,7 +146,7 @@ def lobby():
         return redirect(url_for("index"))
     
     # Filtra salas ativas
-    active_rooms = {name: room.get_room_info() for name, room in rooms.items() if len(room.players) > 0}
+    active_rooms = {name: room.get_room_info() for name, room in list(rooms.items()) if room.members or room.tournament}
     
     return render_template("lobby.html", 
                          username=session["username"],
@@ -88,11 +173,12 @@ def create_room():
     
     # Cria nova sala
     room_obj = Room(room_name, username)
-    rooms[room_name] = room_obj
     
-    # Adiciona o criador como primeiro jogador e admin
+    # Adiciona o criador como primeiro jogador e admin antes de publicar a sala
     user = users[username]
     room_obj.add_player(user)
+    rooms[room_name] = room_obj
+    schedule_card_pool_refill(room_obj)
     
     return redirect(url_for("room", room_name=room_name))
 
@@ -115,63 +201,219 @@ def room(room_name):
                          room_info=room_obj.get_room_info(),
                          is_admin=user.is_admin)
 
-# WebSocket Events
-@socketio.on('connect')
-def handle_connect():
-    """Usuário conectou via WebSocket"""
-    print(f"Cliente conectado: {request.sid}")
+@app.route("/api/history")
+def history_list():
+    """Lista os jogos gravados no histórico (JSON Lines)"""
+    room_name = request.args.get("room")
+    return stream_json_lines(game_history.iter_summaries(room_name))
 
-@socketio.on('disconnect')
-def handle_disconnect():
-    """Usuário desconectou"""
-    print(f"Cliente desconectado: {request.sid}")
+@app.route("/api/history/<int:game_id>/replay")
+def history_replay(game_id):
+    """Reproduz o sorteio de um jogo gravado, um número por linha"""
+    game = game_history.get_game(game_id)
+    if game is None:
+        return jsonify({'error': 'Jogo não encontrado'}), 404
+    return stream_json_lines(iter_replay(game))
+
+@app.route("/api/history/<int:game_id>/verify")
+def history_verify(game_id):
+    """Verifica se uma cartela atingiu uma etapa no jogo gravado"""
+    game = game_history.get_game(game_id)
+    if game is None:
+        return jsonify({'error': 'Jogo não encontrado'}), 404
+    username = request.args.get("username", "")
+    card_index = request.args.get("card", 0, type=int)
+    tier_index = request.args.get("tier", type=int)
+    return jsonify(verify_claim(game, username, card_index, tier_index))
+
+@app.route("/api/history/<int:game_id>/export")
+def history_export(game_id):
+    """Exporta o registro de sorteio e vencedores de um jogo (csv ou jsonl)"""
+    fmt = request.args.get("format", "csv")
+    if fmt not in GAME_LOG_EXPORTS:
+        return jsonify({'error': 'Formato inválido'}), 400
+    
+    game = game_history.get_game(game_id)
+    if game is None:
+        return jsonify({'error': 'Jogo não encontrado'}), 404
+    
+    generate, mimetype = GAME_LOG_EXPORTS[fmt]
+    return stream_export(generate(game), mimetype, f"jogo-{game_id}.{fmt}")
+
+@app.route("/api/room/<room_name>/export/cards")
+def room_cards_export(room_name):
+    """Admin exporta as cartelas da sala (csv, jsonl ou svg para impressão)"""
+    if "username" not in session or session["username"] not in users:
+        return jsonify({'error': 'Não autenticado'}), 401
     
-    # Remove apenas da sessão, mas mantém o usuário na sala para permitir reconexão
-    if request.sid in user_sessions:
-        user_sessions.pop(request.sid, None)
+    room_obj = rooms.get(room_name)
+    if room_obj is None:
+        return jsonify({'error': 'Sala não encontrada'}), 404
+    
+    if room_obj.admin_username != session["username"]:
+        return jsonify({'error': 'Apenas o administrador pode exportar as cartelas'}), 403
+    
+    fmt = request.args.get("format", "csv")
+    if fmt not in CARD_EXPORTS:
+        return jsonify({'error': 'Formato inválido'}), 400
+    
+    generate, mimetype = CARD_EXPORTS[fmt]
+    return stream_export(generate(room_obj), mimetype, f"cartelas-{room_name}.{fmt}")
 
-@socketio.on('join_room')
-def handle_join_room(data):
-    """Usuário entra em uma sala"""
-    room_name = data.get('room')
-    username = session.get('username')
+@app.route("/api/room/<room_name>/state")
+def room_state(room_name):
+    """Estado da sala para polling (ETag por versão; ?since=N envia só os números novos)"""
+    room_obj = rooms.get(room_name)
+    if room_obj is None:
+        return jsonify({'error': 'Sala não encontrada'}), 404
+    
+    etag, body = state_snapshot(room_obj, request.args.get("since", 0, type=int))
+    return conditional_response(etag, body)
+
+@app.route("/api/room/<room_name>/cards/<username>")
+def room_player_cards(room_name, username):
+    """Cartelas de um jogador (o próprio jogador ou o admin), com ETag por versão"""
+    if "username" not in session or session["username"] not in users:
+        return jsonify({'error': 'Não autenticado'}), 401
     
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao entrar na sala'})
-        return
+    room_obj = rooms.get(room_name)
+    if room_obj is None:
+        return jsonify({'error': 'Sala não encontrada'}), 404
     
-    user = users[username]
-    room_obj = rooms[room_name]
+    if session["username"] not in (username, room_obj.admin_username):
+        return jsonify({'error': 'Apenas o próprio jogador ou o administrador podem ver estas cartelas'}), 403
+    
+    player = room_obj.get_player(username)
+    if player is None:
+        return jsonify({'error': 'Jogador não encontrado na sala'}), 404
+    
+    etag, body = cards_snapshot(room_obj, player)
+    return conditional_response(etag, body, private=True)
+
+def odds_admin_room(room_name):
+    """(sala, None) se o usuário é admin da sala, senão (None, resposta de erro)"""
+    if "username" not in session or session["username"] not in users:
+        return None, (jsonify({'error': 'Não autenticado'}), 401)
+    
+    room_obj = rooms.get(room_name)
+    if room_obj is None:
+        return None, (jsonify({'error': 'Sala não encontrada'}), 404)
+    
+    if room_obj.admin_username != session["username"]:
+        return None, (jsonify({'error': 'Apenas o administrador pode consultar as probabilidades'}), 403)
+    return room_obj, None
+
+def odds_job_response(room_name, job):
+    """Situação de uma simulação: 202 enquanto roda, o resultado quando termina"""
+    job_id, params, future = job
+    if not future.done():
+        location = url_for('room_odds_job', room_name=room_name, job_id=job_id)
+        return jsonify(dict(params, status='running', job_id=job_id)), 202, {'Location': location}
+    try:
+        return jsonify(dict(future.result(), status='done', job_id=job_id))
+    except PoolFull:
+        return jsonify({'error': 'Servidor ocupado, tente novamente em instantes', 'status': 'failed'}), 503
+    except Exception as e:
+        print(f"[DEBUG] Falha na simulação da sala {room_name}: {e!r}")
+        return jsonify({'error': 'Erro ao simular as probabilidades', 'status': 'failed'}), 500
+
+@app.route("/api/room/<room_name>/odds")
+def room_odds(room_name):
+    """Admin consulta as chances de vitória por quantidade de cartelas na sala
+
+    Um resultado em cache é respondido na hora; senão a simulação roda em
+    segundo plano (uma por sala) e a resposta 202 indica onde consultá-la.
+    """
+    room_obj, error = odds_admin_room(room_name)
+    if error:
+        return error
+    
+    pattern = request.args.get("pattern", "full_house")
+    if pattern not in PRIZE_PATTERNS:
+        return jsonify({'error': f'Padrão desconhecido: {pattern}'}), 400
+    games = min(max(request.args.get("games", 100000, type=int), 1000), ODDS_MAX_GAMES)
+    card_counts = list(room_obj.player_cards_config.values())
+    if not card_counts:
+        return jsonify({'error': 'Sala sem jogadores'}), 400
+    
+    cached = cached_result(card_counts, pattern, games)
+    if cached is not None:
+        return jsonify(dict(cached, status='done'))
+    
+    with odds_lock:
+        job = odds_jobs.get(room_name)
+        if job is None or job[2].done():
+            running = sum(1 for _, _, future in odds_jobs.values() if not future.done())
+            busy = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'}), 503
+            if running >= ODDS_MAX_RUNNING:
+                return busy
+            try:
+                future = workers.io.submit(simulate, card_counts, pattern, games, None, None, workers.cpu)
+            except PoolFull:
+                return busy
+            job = odds_jobs[room_name] = (uuid.uuid4().hex, {'pattern': pattern, 'games': games}, future)
+    return odds_job_response(room_name, job)
+
+@app.route("/api/room/<room_name>/odds/<job_id>")
+def room_odds_job(room_name, job_id):
+    """Admin consulta uma simulação iniciada em /odds"""
+    _, error = odds_admin_room(room_name)
+    if error:
+        return error
+    
+    job = odds_jobs.get(room_name)
+    if job is None or job[0] != job_id:
+        return jsonify({'error': 'Simulação não encontrada'}), 404
+    return odds_job_response(room_name, job)
+
+@app.route("/api/tournament/<name>")
+def tournament_board(name):
+    """Quadro de um torneio: bolas sorteadas, salas e vencedores"""
+    tournament = tournaments.get(name)
+    if tournament is None:
+        return jsonify({'error': 'Torneio não encontrado'}), 404
+    return jsonify(tournament.get_board())
+
+@app.route("/api/workers")
+def workers_stats():
+    """Profundidade das filas do pool de tarefas (threads, processos e salas)"""
+    return jsonify(workers.stats())
+
+# Operações pesadas das salas: rodam no pool (uma por vez em cada sala) e
+# retornam as mensagens (evento, dados, destino) emitidas ao concluir
+
+def task_refill_card_pool(room_obj, sid):
+    """Completa o pool de cartelas da sala"""
+    room_obj.refill_card_pool()
+    return []
+
+def task_join_room(room_obj, sid, user):
+    """Adiciona o jogador (se ainda não estiver na sala) e envia o estado do jogo"""
+    room_name = room_obj.room_name
+    username = user.username
+    messages = []
     
     # Verifica se o usuário já está na sala (caso do criador)
-    if user not in room_obj.players:
+    if not room_obj.has_player(username):
         # Tenta adicionar o usuário à sala
-        if room_obj.add_player(user):
-            join_room(room_name)
-            user_sessions[request.sid] = username
-            
-            # Gera cartelas se o jogo já começou
-            if room_obj.game_started:
-                room_obj.generate_cards_for_player(user)
-            
-            # Notifica todos na sala
-            emit('player_joined', {
-                'username': username,
-                'players_count': len(room_obj.players),
-                'players': [p.username for p in room_obj.players],
-                'is_admin': user.is_admin
-            }, to=room_name)
-            
-        else:
-            emit('room_full', {'message': 'Sala está cheia!'})
-    else:
-        # Usuário já está na sala, apenas conecta via WebSocket
-        join_room(room_name)
-        user_sessions[request.sid] = username
+        if not room_obj.add_player(user):
+            return [('room_full', {'message': 'Sala está cheia!'}, sid)]
+        schedule_card_pool_refill(room_obj)
         
-        # Gera cartelas se o jogo já começou
-        if room_obj.game_started:
-            room_obj.generate_cards_for_player(user)
+        # Notifica todos na sala
+        messages.append(('player_joined', {
+            'username': username,
+            'players_count': len(room_obj.members),
+            'players': room_obj.player_names,
+            'is_admin': user.is_admin
+        }, room_name))
+    
+    events.enter_room(sid, room_name)
+    user_sessions[sid] = username
+    
+    # Gera cartelas se o jogo já começou
+    if room_obj.game_started:
+        room_obj.generate_cards_for_player(user)
     
     # Envia estado atual do jogo para o jogador (novo ou reconectando)
     cards_status = user.get_cards_status() if user.cards else []
@@ -179,307 +421,524 @@ def handle_join_room(data):
     if cards_status:
         print(f"[DEBUG] Primeira cartela: {cards_status[0]}")
     
-    emit('game_state', {
+    messages.append(('game_state', {
         'room_info': room_obj.get_room_info(),
         'cards': cards_status,
         'numbers_drawn': room_obj.numbers_drawn,
-        'players': [p.username for p in room_obj.players],
-        'players_count': len(room_obj.players)
-    })
+        'players': room_obj.player_names,
+        'players_count': len(room_obj.members),
+        'leaderboard': room_obj.get_leaderboard()
+    }, sid))
+    return messages
 
-@socketio.on('leave_room')
-def handle_leave_room(data):
-    """Usuário sai da sala"""
-    room_name = data.get('room')
-    username = session.get('username')
-    
-    if username and username in users and room_name in rooms:
-        user = users[username]
-        room_obj = rooms[room_name]
-        
-        if room_obj.remove_player(user):
-            leave_room(room_name)
-            
-            emit('player_left', {
-                'username': username,
-                'players_count': len(room_obj.players),
-                'players': [p.username for p in room_obj.players]
-            }, to=room_name)
-            
-            # Remove sala se estiver vazia
-            if len(room_obj.players) == 0:
-                rooms.pop(room_name, None)
-
-@socketio.on('start_game')
-def handle_start_game(data):
-    """Admin inicia o jogo"""
-    room_name = data.get('room')
-    username = session.get('username')
-    
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao iniciar jogo'})
-        return
-    
-    user = users[username]
-    room_obj = rooms[room_name]
+def task_leave_room(room_obj, sid, user):
+    """Remove o jogador da sala e apaga a sala se ela ficar vazia"""
+    if not room_obj.remove_player(user):
+        return []
+    
+    # Remove sala se estiver vazia
+    if len(room_obj.members) == 0 and rooms.get(room_obj.room_name) is room_obj:
+        rooms.pop(room_obj.room_name, None)
+    
+    return [('player_left', {
+        'username': user.username,
+        'players_count': len(room_obj.members),
+        'players': room_obj.player_names
+    }, room_obj.room_name)]
+
+def tournament_locked(room_obj, sid):
+    """Erro para operações que, em sala de torneio, só o controlador do torneio faz"""
+    return [('error', {'message': f'A sala faz parte do torneio {room_obj.tournament}; use os comandos do torneio'}, sid)]
+
+def task_start_game(room_obj, sid, tournament=None):
+    """Inicia o jogo, distribui as cartelas e monta o estado de cada jogador"""
+    if room_obj.tournament and (tournament is None or tournament.name != room_obj.tournament):
+        return tournament_locked(room_obj, sid)
     
-    # Verifica se é admin
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode iniciar o jogo'})
-        return
+    if not room_obj.start_game():
+        return [('error', {'message': 'Não é possível iniciar o jogo'}, sid)]
+    schedule_card_pool_refill(room_obj)
     
-    if room_obj.start_game():
-        # Envia evento de jogo iniciado para toda a sala
-        emit('game_started', {
-            'room_info': room_obj.get_room_info()
-        }, to=room_name)
+    # Evento de jogo iniciado para toda a sala
+    messages = [('game_started', {
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)]
+    
+    # Cartelas específicas para cada jogador conectado
+    for session_id, player in room_sessions(room_obj):
+        cards_status = player.get_cards_status()
+        print(f"[DEBUG] Enviando cartelas para {player.username} (session {session_id}): {len(cards_status)} cartelas")
+        if cards_status:
+            print(f"[DEBUG] Primeira cartela de {player.username}: {cards_status[0]}")
         
-        # Envia cartelas específicas para cada jogador conectado
-        for session_id, username in user_sessions.items():
-            if username in [p.username for p in room_obj.players]:
-                player = users[username]
-                cards_status = player.get_cards_status()
-                print(f"[DEBUG] Enviando cartelas para {username} (session {session_id}): {len(cards_status)} cartelas")
-                if cards_status:
-                    print(f"[DEBUG] Primeira cartela de {username}: {cards_status[0]}")
-                
-                socketio.emit('game_state', {
-                    'cards': cards_status,
-                    'room_info': room_obj.get_room_info(),
-                    'numbers_drawn': room_obj.numbers_drawn,
-                    'players': [p.username for p in room_obj.players],
-                    'players_count': len(room_obj.players)
-                }, to=session_id)
-    else:
-        emit('error', {'message': 'Não é possível iniciar o jogo'})
+        messages.append(('game_state', {
+            'cards': cards_status,
+            'room_info': room_obj.get_room_info(),
+            'numbers_drawn': room_obj.numbers_drawn,
+            'players': room_obj.player_names,
+            'players_count': len(room_obj.members)
+        }, session_id))
+    return messages
 
-@socketio.on('draw_number')
-def handle_draw_number(data):
-    """Admin sorteia um número"""
-    room_name = data.get('room')
-    username = session.get('username')
-    
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao sortear número'})
-        return
-    
-    user = users[username]
-    room_obj = rooms[room_name]
-    
-    # Verifica se é admin e se o jogo está ativo
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode sortear números'})
-        return
+def draw_messages(room_obj, number, claimed_tiers):
+    """Mensagens de um número sorteado: bola, ranking, cartelas e etapas premiadas"""
+    winner = room_obj.get_player(room_obj.winner['username']) if room_obj.winner else None
+    room_name = room_obj.room_name
+    
+    messages = [('number_drawn', {
+        'number': number,
+        'total_drawn': len(room_obj.numbers_drawn),
+        'remaining': 75 - len(room_obj.numbers_drawn)
+    }, room_name)]
+    
+    # Ranking das cartelas mais perto do bingo
+    messages.append(('leaderboard', {
+        'leaderboard': room_obj.get_leaderboard()
+    }, room_name))
+    
+    # Atualiza cartelas de todos os jogadores conectados
+    for session_id, player in room_sessions(room_obj):
+        messages.append(('card_updated', {
+            'cards': player.get_cards_status()
+        }, session_id))
+    
+    for tier in claimed_tiers:
+        winners = ', '.join(sorted({w['username'] for w in tier['winners']}))
+        messages.append(('prize_claimed', {
+            'tier': tier,
+            'current_tier': room_obj.current_tier,
+            'message': f"{tier['name']}: {winners}" + (f" ({tier['prize']})" if tier['prize'] else '')
+        }, room_name))
+    
+    if winner:
+        record_game(room_obj)
+        messages.append(('game_finished', {
+            'winner': room_obj.winner,
+            'message': f'{winner.username} fez BINGO!'
+        }, room_name))
+    return messages
+
+def task_draw_number(room_obj, sid):
+    """Sorteia um número, marca as cartelas e premia as etapas conquistadas"""
+    if room_obj.tournament:
+        return [('error', {'message': f'Os números desta sala são sorteados pelo torneio {room_obj.tournament}'}, sid)]
     
     if not room_obj.is_active:
-        emit('error', {'message': 'O jogo não está ativo'})
-        return
+        return [('error', {'message': 'O jogo não está ativo'}, sid)]
     
     # Sorteia número
     number = room_obj.draw_number()
+    if not number:
+        return [('error', {'message': 'Todos os números já foram sorteados'}, sid)]
     
-    if number:
-        # Marca automaticamente o número nas cartelas dos jogadores
-        for player in room_obj.players:
-            player.mark_number(number)
-        
-        # Verifica se alguém ganhou
-        winner = room_obj.check_winner()
-        
-        emit('number_drawn', {
-            'number': number,
-            'total_drawn': len(room_obj.numbers_drawn),
-            'remaining': 75 - len(room_obj.numbers_drawn)
-        }, to=room_name)
-        
-        # Atualiza cartelas de todos os jogadores conectados
-        for session_id, username in user_sessions.items():
-            if username in [p.username for p in room_obj.players]:
-                player = users[username]
-                socketio.emit('card_updated', {
-                    'cards': player.get_cards_status()
-                }, to=session_id)
-        
-        if winner:
-            emit('game_finished', {
-                'winner': room_obj.winner,
-                'message': f'{winner.username} fez BINGO!'
-            }, to=room_name)
-    else:
-        emit('error', {'message': 'Todos os números já foram sorteados'})
-
-@socketio.on('reset_game')
-def handle_reset_game(data):
-    """Admin reinicia o jogo"""
-    room_name = data.get('room')
-    username = session.get('username')
+    # Marca o número apenas nas cartelas que o contêm (índice da sala)
+    room_obj.mark_number(number)
     
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao reiniciar jogo'})
-        return
-    
-    user = users[username]
-    room_obj = rooms[room_name]
-    
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode reiniciar o jogo'})
-        return
+    # Premia as etapas conquistadas com este número (a última encerra o jogo)
+    claimed_tiers = room_obj.evaluate_prizes()
+    return draw_messages(room_obj, number, claimed_tiers)
+
+def task_tournament_balls(room_obj, sid, tournament, balls):
+    """Marca as bolas do torneio na sala, em ordem; a última sala a processar uma bola envia o quadro"""
+    messages = []
+    for number, draw_count in balls:
+        try:
+            marked, claimed_tiers, last = tournament.apply_ball(room_obj, number, draw_count)
+        except Exception as e:
+            # A bola já foi contada por apply_ball; as seguintes ainda precisam ser marcadas
+            print(f"[DEBUG] Falha ao marcar a bola {number} na sala {room_obj.room_name}: {e!r}")
+            messages.append(('error', {'message': f'Erro ao sortear na sala {room_obj.room_name}'}, sid))
+            continue
+        if marked:
+            messages.extend(draw_messages(room_obj, number, claimed_tiers))
+        if last:
+            messages.extend(tournament_board_messages(tournament, sid))
+    return messages
+
+def task_join_tournament(room_obj, sid, tournament, tiers):
+    """Inclui uma sala já existente no torneio com as etapas do torneio"""
+    if room_obj.game_started or room_obj.tournament or not room_obj.set_prize_tiers(tiers):
+        return [('error', {'message': f'A sala {room_obj.room_name} não pode entrar no torneio'}, sid)]
+    if not tournament.add_room(room_obj):
+        return [('error', {'message': f'A sala {room_obj.room_name} não pode entrar no torneio'}, sid)]
+    return [('tournament_board', {'tournament': tournament.get_board()}, room_obj.room_name)]
+
+def task_leave_tournament(room_obj, sid, tournament):
+    """Devolve o sorteio à sala após o cancelamento do torneio"""
+    tournament.release_room(room_obj)
+    return [('tournament_cancelled', {
+        'tournament': tournament.get_board(),
+        'message': f'Torneio {tournament.name} cancelado; a sala volta ao sorteio próprio'
+    }, room_obj.room_name)]
+
+def tournament_board_messages(tournament, sid=None):
+    """Quadro do torneio para todas as salas dele (e para o admin que comandou)"""
+    board = tournament.get_board()
+    event = 'tournament_board'
+    if tournament.is_finished:
+        tournament.release()
+        event = 'tournament_finished'
+    messages = [(event, {'tournament': board}, room_obj.room_name) for room_obj in tournament.room_list()]
+    if sid:
+        messages.append((event, {'tournament': board}, sid))
+    return messages
+
+def task_reset_game(room_obj, sid):
+    """Grava o jogo (mesmo sem vencedor) e limpa o estado da sala"""
+    if room_obj.tournament:
+        return tournament_locked(room_obj, sid)
     
+    record_game(room_obj)
     room_obj.reset_game()
+    schedule_card_pool_refill(room_obj)
     
-    emit('game_reset', {
+    return [('game_reset', {
         'message': 'Jogo reiniciado!',
         'room_info': room_obj.get_room_info()
-    }, to=room_name)
+    }, room_obj.room_name)]
 
-@socketio.on('set_player_cards')
-def handle_set_player_cards(data):
-    """Admin define número de cartelas para um jogador"""
-    room_name = data.get('room')
-    target_username = data.get('username')
-    num_cards = data.get('num_cards', 1)
-    username = session.get('username')
+def task_set_player_cards(room_obj, sid, target_username, num_cards):
+    """Define as cartelas de um jogador, gerando novas se o jogo já começou"""
+    # Em torneio, as cartelas (check-ins) podem mudar até as salas começarem
+    if room_obj.tournament and room_obj.game_started:
+        return tournament_locked(room_obj, sid)
+    
+    if not isinstance(num_cards, int) or not 1 <= num_cards <= MAX_CARDS_PER_PLAYER:
+        return [('error', {'message': f'Informe de 1 a {MAX_CARDS_PER_PLAYER} cartelas'}, sid)]
+    if not room_obj.set_player_cards(target_username, num_cards):
+        return [('error', {'message': 'Erro ao definir cartelas para o jogador'}, sid)]
+    schedule_card_pool_refill(room_obj)
+    
+    # Notifica todos sobre a atualização
+    messages = [('player_cards_updated', {
+        'username': target_username,
+        'num_cards': num_cards,
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)] + players_config_messages(room_obj)
+    
+    # Se o jogo já começou, envia novas cartelas para o jogador
+    if room_obj.game_started:
+        target_user = users.get(target_username)
+        if target_user:
+            messages.extend(('cards_regenerated', {
+                'cards': target_user.get_cards_status(),
+                'message': f'Suas cartelas foram atualizadas para {num_cards}!'
+            }, session_id) for session_id in user_sids(target_username))
+    return messages
+
+def task_update_check_ins(room_obj, sid, target_username, check_ins):
+    """Atualiza os check-ins de um jogador da sala"""
+    # Encontra o jogador e atualiza check-ins
+    target_user = room_obj.get_player(target_username)
+    if not target_user:
+        return [('error', {'message': 'Jogador não encontrado na sala'}, sid)]
+    
+    target_user.check_ins = max(0, check_ins)
+    room_obj.touch()
+    return [('check_ins_updated', {
+        'username': target_username,
+        'check_ins': target_user.check_ins,
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)] + players_config_messages(room_obj)
+
+def task_transfer_admin(room_obj, sid, old_admin, new_admin_username):
+    """Transfere os privilégios de admin para outro jogador da sala"""
+    if not room_obj.transfer_admin(new_admin_username):
+        return [('error', {'message': 'Erro ao transferir admin. Verifique se o jogador existe na sala'}, sid)]
+    
+    return [('admin_transferred', {
+        'old_admin': old_admin,
+        'new_admin': new_admin_username,
+        'message': f'{new_admin_username} agora é o administrador da sala',
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)]
+
+def task_set_prize(room_obj, sid, prize):
+    """Define o prêmio do jogo"""
+    room_obj.set_prize(prize)
+    return [('prize_updated', {
+        'prize': room_obj.prize,
+        'message': f'Prêmio atualizado: {room_obj.prize}' if room_obj.prize else 'Prêmio removido',
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)]
+
+def task_set_prize_tiers(room_obj, sid, tiers):
+    """Define as etapas de premiação (linha, duas linhas, cartela cheia...)"""
+    if room_obj.tournament:
+        return tournament_locked(room_obj, sid)
     
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao definir cartelas'})
-        return
+    if not room_obj.set_prize_tiers(tiers):
+        return [('error', {'message': 'Etapas inválidas ou jogo já iniciado'}, sid)]
     
-    user = users[username]
-    room_obj = rooms[room_name]
+    return [('prize_tiers_updated', {
+        'prize_tiers': room_obj.get_prize_tiers(),
+        'message': 'Etapas de premiação atualizadas' if tiers else 'Etapas de premiação removidas',
+        'room_info': room_obj.get_room_info()
+    }, room_obj.room_name)]
+
+# WebSocket Events
+@events.on('connect')
+def handle_connect():
+    """Usuário conectou via WebSocket"""
+    print(f"Cliente conectado: {current_sid()}")
+
+@events.on('disconnect')
+def handle_disconnect():
+    """Usuário desconectou"""
+    sid = current_sid()
+    print(f"Cliente desconectado: {sid}")
     
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode definir cartelas'})
-        return
+    # Remove apenas da sessão, mas mantém o usuário na sala para permitir reconexão
+    if sid in user_sessions:
+        user_sessions.pop(sid, None)
+    limiter.forget(sid)
+    contexts.invalidate(sid)
+
+@events.on('join_room')
+@limiter.limit(rate=0.5, burst=3)
+@contexts.handler(error='Erro ao entrar na sala')
+def handle_join_room(ctx, data):
+    """Usuário entra em uma sala"""
+    # Entrada, cartelas e estado do jogo são tratados na fila da sala
+    submit_room_task(ctx, task_join_room, ctx.user, error='Erro ao entrar na sala')
+
+@events.on('leave_room')
+@limiter.limit(rate=0.5, burst=3)
+@contexts.handler()
+def handle_leave_room(ctx, data):
+    """Usuário sai da sala"""
+    if ctx.room.has_player(ctx.username):
+        leave_room(ctx.room_name)
+        contexts.invalidate(current_sid())
+        submit_room_task(ctx, task_leave_room, ctx.user, error='Erro ao sair da sala')
+
+@events.on('start_game')
+@limiter.limit(rate=0.5, burst=2)
+@contexts.handler(error='Erro ao iniciar jogo', admin_error='Apenas o administrador pode iniciar o jogo')
+def handle_start_game(ctx, data):
+    """Admin inicia o jogo"""
+    submit_room_task(ctx, task_start_game, error='Erro ao iniciar jogo')
+
+@events.on('draw_number')
+@limiter.limit(rate=5, burst=5)
+@contexts.handler(error='Erro ao sortear número', admin_error='Apenas o administrador pode sortear números')
+def handle_draw_number(ctx, data):
+    """Admin sorteia um número"""
+    submit_room_task(ctx, task_draw_number, error='Erro ao sortear número')
+
+@events.on('reset_game')
+@limiter.limit(rate=0.5, burst=2)
+@contexts.handler(error='Erro ao reiniciar jogo', admin_error='Apenas o administrador pode reiniciar o jogo')
+def handle_reset_game(ctx, data):
+    """Admin reinicia o jogo"""
+    submit_room_task(ctx, task_reset_game, error='Erro ao reiniciar jogo')
+
+@events.on('set_player_cards')
+@limiter.limit(rate=5, burst=20)
+@contexts.handler(error='Erro ao definir cartelas', admin_error='Apenas o administrador pode definir cartelas')
+def handle_set_player_cards(ctx, data):
+    """Admin define número de cartelas para um jogador"""
+    target_username = data.get('username')
+    num_cards = data.get('num_cards', 1)
     
-    if room_obj.set_player_cards(target_username, num_cards):
-        # Notifica todos sobre a atualização
-        emit('player_cards_updated', {
-            'username': target_username,
-            'num_cards': num_cards,
-            'room_info': room_obj.get_room_info()
-        }, to=room_name)
-        
-        # Se o jogo já começou, envia novas cartelas para o jogador
-        if room_obj.game_started:
-            target_user = users.get(target_username)
-            if target_user:
-                socketio.emit('cards_regenerated', {
-                    'cards': target_user.get_cards_status(),
-                    'message': f'Suas cartelas foram atualizadas para {num_cards}!'
-                }, to=target_username)
-    else:
-        emit('error', {'message': 'Erro ao definir cartelas para o jogador'})
+    submit_room_task(ctx, task_set_player_cards, target_username, num_cards,
+                     error='Erro ao definir cartelas para o jogador')
 
-@socketio.on('get_players_config')
-def handle_get_players_config(data):
+@events.on('get_players_config')
+@limiter.limit(rate=2, burst=10)
+@contexts.handler(error='Erro ao obter configuração', admin_error='Apenas o administrador pode ver esta configuração')
+def handle_get_players_config(ctx, data):
     """Admin solicita configuração de cartelas dos jogadores"""
-    room_name = data.get('room')
-    username = session.get('username')
-    
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao obter configuração'})
-        return
-    
-    user = users[username]
-    room_obj = rooms[room_name]
-    
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode ver esta configuração'})
-        return
+    room_obj = ctx.room
     
     emit('players_config', {
         'players': room_obj.get_player_cards_config()
     })
 
-@socketio.on('update_check_ins')
-def handle_update_check_ins(data):
+@events.on('update_check_ins')
+@limiter.limit(rate=5, burst=20)
+@contexts.handler(error='Erro ao atualizar check-ins', admin_error='Apenas o administrador pode atualizar check-ins')
+def handle_update_check_ins(ctx, data):
     """Admin atualiza check-ins de um jogador"""
-    room_name = data.get('room')
-    target_username = data.get('username')
-    check_ins = data.get('check_ins', 0)
-    username = session.get('username')
+    submit_room_task(ctx, task_update_check_ins, data.get('username'), data.get('check_ins', 0),
+                     error='Erro ao atualizar check-ins')
+
+@events.on('transfer_admin')
+@limiter.limit(rate=0.5, burst=2)
+@contexts.handler(error='Erro ao transferir admin', admin_error='Apenas o administrador pode transferir privilégios')
+def handle_transfer_admin(ctx, data):
+    """Admin transfere privilégios para outro jogador"""
+    new_admin_username = data.get('new_admin')
     
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao atualizar check-ins'})
+    if ctx.username == new_admin_username:
+        emit('error', {'message': 'Você já é o administrador'})
         return
     
-    user = users[username]
-    room_obj = rooms[room_name]
-    
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode atualizar check-ins'})
+    submit_room_task(ctx, task_transfer_admin, ctx.username, new_admin_username,
+                     error='Erro ao transferir admin')
+
+@events.on('set_prize')
+@limiter.limit(rate=1, burst=5)
+@contexts.handler(error='Erro ao definir prêmio', admin_error='Apenas o administrador pode definir o prêmio')
+def handle_set_prize(ctx, data):
+    """Admin define o prêmio do jogo"""
+    submit_room_task(ctx, task_set_prize, data.get('prize', '').strip(), error='Erro ao definir prêmio')
+
+@events.on('set_prize_tiers')
+@limiter.limit(rate=1, burst=5)
+@contexts.handler(error='Erro ao definir etapas de premiação', admin_error='Apenas o administrador pode definir as etapas de premiação')
+def handle_set_prize_tiers(ctx, data):
+    """Admin define as etapas de premiação (linha, duas linhas, cartela cheia...)"""
+    submit_room_task(ctx, task_set_prize_tiers, data.get('tiers', []),
+                     error='Erro ao definir etapas de premiação')
+
+def get_admin_tournament(data):
+    """Torneio do evento, se quem enviou for o administrador dele"""
+    tournament = tournaments.get((data or {}).get('tournament'))
+    if tournament is None:
+        emit('error', {'message': 'Torneio não encontrado'})
+        return None
+    if tournament.admin_username != session_username():
+        emit('error', {'message': 'Apenas o administrador do torneio pode comandá-lo'})
+        return None
+    return tournament
+
+@events.on('create_tournament')
+@limiter.limit(rate=0.5, burst=2)
+def handle_create_tournament(data):
+    """Admin cria um torneio com várias salas (as que não existem são criadas)"""
+    data = data or {}
+    username = session_username()
+    if username not in users:
+        emit('error', {'message': 'Erro ao criar torneio'})
         return
     
-    # Encontra o jogador e atualiza check-ins
-    target_user = users.get(target_username)
-    if target_user and target_user in room_obj.players:
-        target_user.check_ins = max(0, check_ins)
-        
-        emit('check_ins_updated', {
-            'username': target_username,
-            'check_ins': target_user.check_ins,
-            'room_info': room_obj.get_room_info()
-        }, to=room_name)
-    else:
-        emit('error', {'message': 'Jogador não encontrado na sala'})
-
-@socketio.on('transfer_admin')
-def handle_transfer_admin(data):
-    """Admin transfere privilégios para outro jogador"""
-    room_name = data.get('room')
-    new_admin_username = data.get('new_admin')
-    username = session.get('username')
+    name = str(data.get('tournament', '')).strip()
+    room_names = list(dict.fromkeys(str(n).strip() for n in data.get('rooms', []) if len(str(n).strip()) >= 3))
+    if len(name) < 3 or not room_names:
+        emit('error', {'message': 'Informe o nome do torneio e as salas'})
+        return
     
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao transferir admin'})
+    if name in tournaments and not tournaments[name].is_finished:
+        emit('error', {'message': 'Já existe um torneio com esse nome'})
         return
     
-    user = users[username]
-    room_obj = rooms[room_name]
+    # Salas existentes precisam ser do mesmo admin e estar sem jogo em andamento
+    for room_name in room_names:
+        room_obj = rooms.get(room_name)
+        if room_obj and (room_obj.admin_username != username or room_obj.game_started or room_obj.tournament):
+            emit('error', {'message': f'A sala {room_name} não pode entrar no torneio'})
+            return
     
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode transferir privilégios'})
+    tiers = data.get('tiers') or []
+    if parse_prize_tiers(tiers) is None:
+        emit('error', {'message': 'Etapas de premiação inválidas'})
         return
     
-    if username == new_admin_username:
-        emit('error', {'message': 'Você já é o administrador'})
+    tournament = Tournament(name, username)
+    tournaments[name] = tournament
+    sid = current_sid()
+    for room_name in room_names:
+        room_obj = rooms.get(room_name)
+        if room_obj is None:
+            # Sala nova: configurada por completo antes de ser publicada
+            room_obj = Room(room_name, username)
+            room_obj.set_prize_tiers(tiers)
+            tournament.add_room(room_obj)
+            rooms[room_name] = room_obj
+            schedule_card_pool_refill(room_obj)
+        else:
+            # Sala existente: entra no torneio pela fila da sala
+            try:
+                workers.submit_room(room_name, task_join_tournament, room_obj, sid, tournament, tiers,
+                                    on_error=[('error', {'message': f'A sala {room_name} não pode entrar no torneio'}, sid)])
+            except PoolFull:
+                emit('error', {'message': f'Servidor ocupado; a sala {room_name} não entrou no torneio'})
+    print(f"[DEBUG] Torneio {name} criado por {username} com {len(room_names)} salas")
+    
+    board = tournament.get_board()
+    emit('tournament_created', {
+        'tournament': board,
+        'message': f'Torneio {name} criado com {len(room_names)} salas'
+    })
+    for room_name in room_names:
+        emit('tournament_board', {'tournament': board}, to=room_name)
+
+@events.on('start_tournament')
+@limiter.limit(rate=0.5, burst=2)
+def handle_start_tournament(data):
+    """Admin inicia o jogo em todas as salas do torneio"""
+    tournament = get_admin_tournament(data)
+    if tournament is None:
+        return
+    if tournament.is_active or tournament.is_finished:
+        emit('error', {'message': 'O torneio já foi iniciado'})
         return
     
-    if room_obj.transfer_admin(new_admin_username):
-        emit('admin_transferred', {
-            'old_admin': username,
-            'new_admin': new_admin_username,
-            'message': f'{new_admin_username} agora é o administrador da sala',
-            'room_info': room_obj.get_room_info()
-        }, to=room_name)
-    else:
-        emit('error', {'message': 'Erro ao transferir admin. Verifique se o jogador existe na sala'})
+    tournament.start()
+    sid = current_sid()
+    for room_obj in tournament.room_list():
+        try:
+            workers.submit_room(room_obj.room_name, task_start_game, room_obj, sid, tournament,
+                                on_error=[('error', {'message': f'Erro ao iniciar a sala {room_obj.room_name}'}, sid)])
+        except PoolFull:
+            emit('error', {'message': f'Servidor ocupado ao iniciar a sala {room_obj.room_name}'})
 
-@socketio.on('set_prize')
-def handle_set_prize(data):
-    """Admin define o prêmio do jogo"""
-    room_name = data.get('room')
-    prize = data.get('prize', '').strip()
-    username = session.get('username')
-    
-    if not username or username not in users or room_name not in rooms:
-        emit('error', {'message': 'Erro ao definir prêmio'})
+@events.on('cancel_tournament')
+@limiter.limit(rate=0.5, burst=2)
+def handle_cancel_tournament(data):
+    """Admin cancela o torneio e devolve o sorteio às salas"""
+    tournament = get_admin_tournament(data)
+    if tournament is None:
+        return
+    if not tournament.cancel():
+        emit('error', {'message': 'O torneio já foi encerrado'})
         return
     
-    user = users[username]
-    room_obj = rooms[room_name]
-    
-    if not user.is_admin:
-        emit('error', {'message': 'Apenas o administrador pode definir o prêmio'})
+    sid = current_sid()
+    for room_obj in tournament.room_list():
+        try:
+            workers.submit_room(room_obj.room_name, task_leave_tournament, room_obj, sid, tournament,
+                                on_error=[('error', {'message': f'Erro ao liberar a sala {room_obj.room_name}'}, sid)])
+        except PoolFull:
+            # Fila cheia: libera mesmo assim, para a sala não ficar presa ao torneio
+            tournament.release_room(room_obj)
+    print(f"[DEBUG] Torneio {tournament.name} cancelado")
+    emit('tournament_cancelled', {
+        'tournament': tournament.get_board(),
+        'message': f'Torneio {tournament.name} cancelado'
+    })
+
+@events.on('tournament_draw')
+@limiter.limit(rate=5, burst=5)
+def handle_tournament_draw(data):
+    """Admin sorteia a próxima bola do baralho do torneio para todas as salas"""
+    tournament = get_admin_tournament(data)
+    if tournament is None:
         return
     
-    room_obj.set_prize(prize)
+    number, targets = tournament.next_ball()
+    # Salas com bolas guardadas recebem-nas mesmo que não estejam entre os alvos
+    deferred = [room_obj for room_obj in tournament.deferred_rooms() if room_obj not in targets]
+    if number is None and not deferred:
+        emit('error', {'message': 'O torneio não está ativo'})
+        return
     
-    emit('prize_updated', {
-        'prize': room_obj.prize,
-        'message': f'Prêmio atualizado: {room_obj.prize}' if room_obj.prize else 'Prêmio removido',
-        'room_info': room_obj.get_room_info()
-    }, to=room_name)
+    # Uma passada pelas salas; cada uma marca as bolas na sua fila, pelo índice de números
+    sid = current_sid()
+    draw_count = len(tournament.numbers_drawn)
+    for room_obj in targets + deferred:
+        if room_obj in targets:
+            balls = tournament.take_balls(room_obj, number, draw_count)
+        else:
+            balls = tournament.take_balls(room_obj)
+        try:
+            workers.submit_room(room_obj.room_name, task_tournament_balls, room_obj, sid, tournament, balls,
+                                on_error=[('error', {'message': f'Erro ao sortear na sala {room_obj.room_name}'}, sid)])
+        except PoolFull:
+            tournament.defer_balls(room_obj, balls)
+            numbers = ', '.join(str(ball) for ball, _ in balls)
+            emit('error', {'message': f'Sala {room_obj.room_name} ocupada: bola(s) {numbers} serão entregues no próximo sorteio'})
 
 if __name__ == "__main__":
     # Cria diretórios se não existirem
@@ -492,4 +951,9 @@ if __name__ == "__main__":
     
     print("🎯 Servidor Bingo da Golden Club iniciado!")
     print(f"🌐 Rodando em: {host}:{port}")
-    socketio.run(app, debug=False, host=host, port=port)
\ No newline at end of file
+    if os.environ.get('BINGO_SERVER_MODE', 'wsgi') == 'asgi':
+        # Modo assíncrono: handlers como corrotinas em um único event loop
+        import uvicorn
+        uvicorn.run('asgi:application', host=host, port=port)
+    else:
+        socketio.run(app, debug=False, host=host, port=port)
\ No newline at end of file
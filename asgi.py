@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo assíncrono (ASGI) do Bingo da Golden Club
+
+Serve os mesmos handlers de app.py com `socketio.AsyncServer`: cada evento
+roda como corrotina em um único event loop, então conexões ociosas não
+ocupam threads e um processo aguenta milhares de clientes. As páginas HTTP
+do Flask continuam as mesmas, servidas via adaptador WSGI -> ASGI. Salas,
+jogadores e histórico são os mesmos objetos de app.py.
+
+Uso:
+    BINGO_SERVER_MODE=asgi python app.py
+    uvicorn asgi:application --host 0.0.0.0 --port 8080
+"""
+
+import asyncio
+from http.cookies import SimpleCookie
+
+import socketio
+from a2wsgi import WSGIMiddleware
+from itsdangerous import BadSignature
+
+import transport
+from app import app, events
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+_session_serializer = app.session_interface.get_signing_serializer(app)
+
+
+def username_from_environ(environ):
+    """Lê o usuário do cookie de sessão do Flask enviado no handshake"""
+    cookie = SimpleCookie(environ.get('HTTP_COOKIE', ''))
+    morsel = cookie.get(app.config['SESSION_COOKIE_NAME'])
+    if morsel is None:
+        return None
+    try:
+        return _session_serializer.loads(morsel.value).get('username')
+    except BadSignature:
+        return None
+
+
+async def _dispatch(sid, username, handler, *args):
+    """Executa um handler de app.py e envia as operações que ele enfileirou"""
+    outbox = transport.Outbox(sid, username)
+    token = transport.activate(outbox)
+    try:
+        handler(*args)
+    finally:
+        transport.deactivate(token)
+    await outbox.flush(sio)
+
+
+def _make_event_handler(handler):
+    async def on_event(sid, data=None):
+        session = await sio.get_session(sid)
+        await _dispatch(sid, session.get('username'), handler, data)
+    return on_event
+
+
+@sio.event
+async def connect(sid, environ, auth=None):
+    username = username_from_environ(environ)
+    await sio.save_session(sid, {'username': username})
+    handler = events.handlers.get('connect')
+    if handler:
+        await _dispatch(sid, username, handler)
+
+
+@sio.event
+async def disconnect(sid):
+    handler = events.handlers.get('disconnect')
+    if handler:
+        session = await sio.get_session(sid)
+        await _dispatch(sid, session.get('username'), handler)
+
+
+for _event, _handler in events.handlers.items():
+    if _event not in ('connect', 'disconnect'):
+        sio.on(_event, _make_event_handler(_handler))
+
+
+async def on_startup():
+    # Tarefas do pool (outras threads) agendam os envios neste loop
+    events.loop = asyncio.get_running_loop()
+
+
+events.async_mode = True
+events.server = sio
+application = socketio.ASGIApp(sio, other_asgi_app=WSGIMiddleware(app), on_startup=on_startup)
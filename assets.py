@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline de arquivos estáticos do Bingo da Golden Club
+
+Na inicialização cada arquivo de `static/` recebe um nome com o hash do
+conteúdo (ex.: `style.3f2a9c1b7d4e.css`) e versões pré-comprimidas em gzip
+e brotli. Como o nome muda sempre que o conteúdo muda, os arquivos são
+servidos com cache imutável de um ano e o navegador só volta a baixá-los
+após um deploy.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, request, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional; sem ele servimos apenas gzip
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.html', '.json', '.txt'}
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class Asset:
+    def __init__(self, logical_name, data):
+        self.logical_name = logical_name
+        self.digest = hashlib.sha256(data).hexdigest()[:12]
+        root, ext = os.path.splitext(logical_name)
+        self.hashed_name = f"{root}.{self.digest}{ext}"
+        self.mimetype = mimetypes.guess_type(logical_name)[0] or 'application/octet-stream'
+        self.variants = {'identity': data}  # {content-encoding: bytes}
+        if ext in COMPRESSIBLE_EXTENSIONS:
+            self.variants['gzip'] = gzip.compress(data, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants['br'] = brotli.compress(data, quality=11)
+
+    def pick_encoding(self, accept_encoding):
+        """Escolhe a variante de maior q aceita pelo cliente; no empate, a menor (br)"""
+        weights = parse_accept_encoding(accept_encoding)
+        default = weights.get('*', 0.0)  # `*` vale para as codificações não listadas
+        candidates = [encoding for encoding in ('br', 'gzip')
+                      if encoding in self.variants and weights.get(encoding, default) > 0]
+        # max() devolve o primeiro dos empatados, mantendo a ordem de preferência
+        return max(candidates, key=lambda encoding: weights.get(encoding, default), default='identity')
+
+
+def parse_accept_encoding(header):
+    """{codificação: q} do cabeçalho Accept-Encoding (q inválido conta como 0)"""
+    weights = {}
+    for token in header.split(','):
+        name, _, params = token.partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+class AssetPipeline:
+    def __init__(self, app=None, url_prefix='/assets'):
+        self.url_prefix = url_prefix
+        self.assets = {}  # {nome lógico: Asset}
+        self.by_hashed_name = {}  # {nome com hash: Asset}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Gera os arquivos com hash e registra a rota e o helper `asset_url`"""
+        self.build(app.static_folder)
+        app.add_url_rule(f"{self.url_prefix}/<path:filename>", 'assets', self.serve)
+        app.context_processor(lambda: {'asset_url': self.url})
+        print(f"[DEBUG] {len(self.assets)} arquivos estáticos preparados "
+              f"({'gzip+brotli' if brotli is not None else 'gzip'})")
+
+    def build(self, static_folder):
+        """Lê todos os arquivos estáticos e prepara suas variantes"""
+        self.assets = {}
+        self.by_hashed_name = {}
+        for directory, _, filenames in os.walk(static_folder):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                logical_name = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                with open(path, 'rb') as f:
+                    asset = Asset(logical_name, f.read())
+                self.assets[logical_name] = asset
+                self.by_hashed_name[asset.hashed_name] = asset
+
+    def url(self, logical_name):
+        """URL com hash de um arquivo estático (cai para /static se não existir)"""
+        asset = self.assets.get(logical_name)
+        if asset is None:
+            return url_for('static', filename=logical_name)
+        return url_for('assets', filename=asset.hashed_name)
+
+    def serve(self, filename):
+        """Serve a variante pré-comprimida com ETag e cache imutável"""
+        asset = self.by_hashed_name.get(filename)
+        if asset is None:
+            abort(404)
+
+        encoding = asset.pick_encoding(request.headers.get('Accept-Encoding', ''))
+        etag = f"{asset.digest}-{encoding}"
+        headers = {
+            'Cache-Control': CACHE_CONTROL,
+            'ETag': f'"{etag}"',
+            'Vary': 'Accept-Encoding',
+        }
+        if etag in request.if_none_match:
+            return Response(status=304, headers=headers)
+
+        body = asset.variants[encoding]
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(body, mimetype=asset.mimetype, headers=headers)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exportação em massa do Bingo da Golden Club
+
+Gera as cartelas de uma sala (CSV, JSON Lines ou SVG para impressão) e o
+registro de sorteio/vencedores de jogos do histórico. Tudo é produzido por
+geradores, uma cartela ou um número por vez, e agrupado em blocos para a
+resposta HTTP chunked: a memória usada não depende da quantidade de
+cartelas e os primeiros bytes saem imediatamente.
+"""
+
+import csv
+import io
+import itertools
+import json
+from xml.sax.saxutils import escape
+
+from history import iter_replay
+
+LETTERS = 'BINGO'
+CARD_COLUMNS = [f"{LETTERS[col]}{row + 1}" for row in range(5) for col in range(5)]
+CHUNK_SIZE = 16 * 1024  # Bytes acumulados antes de enviar um bloco
+
+# Layout do SVG de impressão (unidades em px)
+SVG_CELL = 48
+SVG_CARD_WIDTH = SVG_CELL * 5
+SVG_CARD_HEIGHT = SVG_CELL * 6 + 24
+SVG_MARGIN = 24
+SVG_CARDS_PER_ROW = 3
+
+
+def iter_room_cards(room):
+    """Gera (username, índice, cartela) para todas as cartelas da sala"""
+    for player in room.players:
+        for card_index, card in enumerate(player.cards):
+            yield player.username, card_index, card
+
+
+def card_rows(card):
+    """Cartela na ordem de leitura (linha a linha), a partir da lista por coluna"""
+    return [card[col * 5 + row] for row in range(5) for col in range(5)]
+
+
+def chunked(pieces, size=CHUNK_SIZE):
+    """Agrupa pequenos pedaços de texto em blocos de ~`size` bytes"""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= size:
+            yield ''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _csv_lines(header, rows):
+    """Gera linhas CSV uma a uma reaproveitando o mesmo buffer"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in itertools.chain([header], rows):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def cards_csv(room):
+    """Cartelas da sala em CSV (uma cartela por linha, células B1..O5)"""
+    rows = ([room.room_name, username, card_index + 1] + card_rows(card)
+            for username, card_index, card in iter_room_cards(room))
+    return chunked(_csv_lines(['room', 'username', 'card'] + CARD_COLUMNS, rows))
+
+
+def cards_jsonl(room):
+    """Cartelas da sala em JSON Lines"""
+    def lines():
+        for username, card_index, card in iter_room_cards(room):
+            cells = card_rows(card)
+            yield json.dumps({
+                'room': room.room_name,
+                'username': username,
+                'card': card_index + 1,
+                'rows': [cells[row * 5:row * 5 + 5] for row in range(5)]
+            }, ensure_ascii=False) + '\n'
+    return chunked(lines())
+
+
+def _svg_card(x, y, title, card):
+    """Uma cartela em SVG, posicionada em (x, y)"""
+    parts = [
+        f'<g transform="translate({x},{y})">',
+        f'<text x="{SVG_CARD_WIDTH // 2}" y="16" class="title">{escape(title)}</text>',
+    ]
+    for col, letter in enumerate(LETTERS):
+        parts.append(f'<text x="{col * SVG_CELL + SVG_CELL // 2}" y="{24 + SVG_CELL * 0.7:.0f}" class="letter">{letter}</text>')
+    for index, number in enumerate(card_rows(card)):
+        row, col = divmod(index, 5)
+        cx = col * SVG_CELL
+        cy = 24 + (row + 1) * SVG_CELL
+        parts.append(f'<rect x="{cx}" y="{cy}" width="{SVG_CELL}" height="{SVG_CELL}"/>')
+        css_class = ' class="free"' if number == 'FREE' else ''
+        parts.append(f'<text x="{cx + SVG_CELL // 2}" y="{cy + SVG_CELL * 0.65:.0f}"{css_class}>{number}</text>')
+    parts.append('</g>\n')
+    return ''.join(parts)
+
+
+def cards_svg(room):
+    """Cartelas da sala em um único SVG para impressão, em grade"""
+    total = sum(len(player.cards) for player in room.players)
+    rows = max(1, -(-total // SVG_CARDS_PER_ROW))
+    width = SVG_CARDS_PER_ROW * (SVG_CARD_WIDTH + SVG_MARGIN) + SVG_MARGIN
+    height = rows * (SVG_CARD_HEIGHT + SVG_MARGIN) + SVG_MARGIN
+
+    def pieces():
+        yield (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+               f'viewBox="0 0 {width} {height}">\n'
+               '<style>rect{fill:#fff;stroke:#000;stroke-width:1.5}'
+               'text{font-family:Arial,sans-serif;font-size:18px;text-anchor:middle}'
+               '.title{font-size:14px}.letter{font-weight:bold;font-size:22px}.free{font-size:12px}</style>\n')
+        for position, (username, card_index, card) in enumerate(iter_room_cards(room)):
+            row, col = divmod(position, SVG_CARDS_PER_ROW)
+            x = SVG_MARGIN + col * (SVG_CARD_WIDTH + SVG_MARGIN)
+            y = SVG_MARGIN + row * (SVG_CARD_HEIGHT + SVG_MARGIN)
+            yield _svg_card(x, y, f"{room.room_name} - {username} - Cartela {card_index + 1}", card)
+        yield '</svg>\n'
+
+    return chunked(pieces())
+
+
+def game_log_csv(game):
+    """Registro de um jogo do histórico em CSV: um número sorteado por linha"""
+    rows = ([event['draw'], event['number'],
+             ' '.join(f"{b['username']}#{b['card_index'] + 1}" for b in event['bingos']),
+             ' '.join(f"{prize['tier']}:{w['username']}#{w['card_index'] + 1}"
+                      for prize in event['prizes'] for w in prize['winners'])]
+            for event in iter_replay(game))
+    return chunked(_csv_lines(['draw', 'number', 'bingos', 'prizes'], rows))
+
+
+def game_log_jsonl(game):
+    """Registro de um jogo do histórico em JSON Lines, terminando com vencedor e etapas"""
+    def lines():
+        for event in iter_replay(game):
+            yield json.dumps(event, ensure_ascii=False) + '\n'
+        yield json.dumps({
+            'winner': game['winner'],
+            'winning_cards': game['winning_cards'],
+            'ball': game['ball'],
+            'draw_count': game['draw_count'],
+            'prize': game['prize'],
+            'tiers': game['tiers']
+        }, ensure_ascii=False) + '\n'
+    return chunked(lines())
+
+
+CARD_EXPORTS = {
+    'csv': (cards_csv, 'text/csv'),
+    'jsonl': (cards_jsonl, 'application/x-ndjson'),
+    'svg': (cards_svg, 'image/svg+xml'),
+}
+
+GAME_LOG_EXPORTS = {
+    'csv': (game_log_csv, 'text/csv'),
+    'jsonl': (game_log_jsonl, 'application/x-ndjson'),
+}
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Histórico de jogos do Bingo da Golden Club
+
+Cada jogo finalizado é gravado em um log binário somente-anexo. Um registro
+guarda a ordem dos números sorteados, as cartelas de cada jogador, o
+vencedor e as etapas de premiação com seus vencedores, permitindo listar
+jogos antigos, reproduzir o sorteio e verificar uma vitória sem o servidor em execução.
+
+Formato do arquivo (little-endian):
+    cabeçalho: MAGIC (4 bytes)
+    registros: uint32 tamanho + payload
+
+Payload de um registro:
+    resumo:   room_name, prize, started_at, finished_at, winner, ball, draw_count
+    sorteio:  uint8 quantidade + 1 byte por número
+    jogadores: uint16 quantidade, e para cada um nome + uint8 cartelas +
+               25 bytes por cartela (0 representa o centro FREE); a sala
+               limita as cartelas por jogador a MAX_CARDS_PER_PLAYER
+    vencedoras: uint8 quantidade + 1 byte por índice de cartela
+    etapas:   uint8 quantidade, e para cada uma nome, padrão, prêmio +
+              uint16 vencedores (nome + uint8 cartela + uint8 bola +
+              uint8 quantidade sorteada)
+
+Registros gravados antes das etapas terminam nas cartelas vencedoras e são
+lidos como uma única etapa de cartela cheia.
+
+O identificador de um jogo é o offset do registro no arquivo, que nunca muda
+porque o log só recebe novos registros no final. Os offsets válidos ficam em
+um índice em memória, completado a partir do fim já indexado quando o
+arquivo cresce; um id fora do índice não é decodificado.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+import time
+
+from models import CARD_LINES, MAX_CARDS_PER_PLAYER, PRIZE_PATTERNS
+
+MAGIC = b'BGH1'
+FREE_CELL = 0
+CARD_SIZE = 25
+
+_U8 = struct.Struct('<B')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_F64 = struct.Struct('<d')
+
+
+def card_bitmask(card):
+    """Converte uma cartela em bitmask de 75 bits (bit n-1 = número n)"""
+    mask = 0
+    for number in card:
+        if number != 'FREE':
+            mask |= 1 << (number - 1)
+    return mask
+
+
+def card_line_masks(card):
+    """Bitmask de cada linha da cartela (CARD_LINES); o centro FREE já vem marcado"""
+    return [card_bitmask([card[position] for position in line]) for line in CARD_LINES]
+
+
+def _pack_str(value):
+    # Corta em 255 bytes sem quebrar um caractere multibyte no meio
+    data = (value or '').encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+    return _U8.pack(len(data)) + data
+
+
+def _pack_card(card):
+    return bytes(FREE_CELL if n == 'FREE' else n for n in card)
+
+
+def _unpack_card(data):
+    return ['FREE' if n == FREE_CELL else n for n in data]
+
+
+class _Reader:
+    """Cursor simples sobre os bytes de um payload"""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def take(self, size):
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return chunk
+
+    def unpack(self, fmt):
+        value = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+    def string(self):
+        return self.take(self.unpack(_U8)).decode('utf-8')
+
+
+def encode_game(room):
+    """Serializa o estado final de uma sala em um payload binário"""
+    winner = room.winner or {}
+    draws = room.numbers_drawn
+    parts = [
+        _pack_str(room.room_name),
+        _pack_str(room.prize),
+        _F64.pack(room.started_at.timestamp() if room.started_at else 0.0),
+        _F64.pack(time.time()),
+        _pack_str(winner.get('username')),
+        _U8.pack(winner.get('ball') or 0),
+        _U8.pack(winner.get('draw_count') or 0),
+        _U8.pack(len(draws)),
+        bytes(draws),
+        _U16.pack(len(room.players)),
+    ]
+    for player in room.players:
+        if len(player.cards) > MAX_CARDS_PER_PLAYER:
+            raise ValueError(f"{player.username} tem mais de {MAX_CARDS_PER_PLAYER} cartelas")
+        parts.append(_pack_str(player.username))
+        parts.append(_U8.pack(len(player.cards)))
+        parts.extend(_pack_card(card) for card in player.cards)
+    winning_cards = winner.get('winning_cards', [])
+    parts.append(_U8.pack(len(winning_cards)))
+    parts.append(bytes(winning_cards))
+    parts.append(_U8.pack(len(room.prize_tiers)))
+    for tier in room.prize_tiers:
+        parts.append(_pack_str(tier['name']))
+        parts.append(_pack_str(tier['pattern']))
+        parts.append(_pack_str(tier['prize']))
+        parts.append(_U16.pack(len(tier['winners'])))
+        for tier_winner in tier['winners']:
+            parts.append(_pack_str(tier_winner['username']))
+            parts.append(_U8.pack(tier_winner['card_index']))
+            parts.append(_U8.pack(tier_winner['ball'] or 0))
+            parts.append(_U8.pack(tier_winner['draw_count']))
+    return b''.join(parts)
+
+
+def decode_summary(reader):
+    """Lê apenas o resumo do início de um payload"""
+    summary = {
+        'room_name': reader.string(),
+        'prize': reader.string(),
+        'started_at': reader.unpack(_F64),
+        'finished_at': reader.unpack(_F64),
+        'winner': reader.string() or None,
+        'ball': reader.unpack(_U8) or None,
+        'draw_count': reader.unpack(_U8) or None,
+    }
+    return summary
+
+
+def decode_game(payload):
+    """Decodifica um payload completo"""
+    reader = _Reader(payload)
+    game = decode_summary(reader)
+    game['numbers_drawn'] = list(reader.take(reader.unpack(_U8)))
+    players = []
+    for _ in range(reader.unpack(_U16)):
+        username = reader.string()
+        cards = [_unpack_card(reader.take(CARD_SIZE)) for _ in range(reader.unpack(_U8))]
+        players.append({'username': username, 'cards': cards})
+    game['players'] = players
+    game['winning_cards'] = list(reader.take(reader.unpack(_U8)))
+    if reader.pos < len(payload):
+        game['tiers'] = [decode_tier(reader) for _ in range(reader.unpack(_U8))]
+    else:
+        game['tiers'] = []
+    if not game['tiers']:
+        # Registro sem etapas: a regra tradicional, cartela cheia
+        game['tiers'] = [{
+            'name': 'Bingo',
+            'pattern': 'full_house',
+            'prize': game['prize'],
+            'winners': [{
+                'username': game['winner'],
+                'card_index': card_index,
+                'ball': game['ball'],
+                'draw_count': game['draw_count']
+            } for card_index in game['winning_cards']] if game['winner'] else []
+        }]
+    return game
+
+
+def decode_tier(reader):
+    """Lê uma etapa de premiação e seus vencedores"""
+    tier = {
+        'name': reader.string(),
+        'pattern': reader.string(),
+        'prize': reader.string(),
+    }
+    tier['winners'] = [{
+        'username': reader.string(),
+        'card_index': reader.unpack(_U8),
+        'ball': reader.unpack(_U8) or None,
+        'draw_count': reader.unpack(_U8)
+    } for _ in range(reader.unpack(_U16))]
+    return tier
+
+
+class GameHistory:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._offsets = set()  # Offsets dos registros já indexados
+        self._indexed_end = len(MAGIC)  # Fim do último registro indexado
+
+    def append(self, room):
+        """Grava o jogo atual da sala no final do log e retorna seu id"""
+        payload = encode_game(room)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(MAGIC)
+                game_id = f.tell()
+                f.write(_U32.pack(len(payload)) + payload)
+            if game_id == self._indexed_end:
+                self._offsets.add(game_id)
+                self._indexed_end = game_id + _U32.size + len(payload)
+        print(f"[DEBUG] Jogo da sala {room.room_name} gravado no histórico (id {game_id})")
+        return game_id
+
+    def _iter_raw(self, decode, start=None):
+        """Percorre os registros do arquivo um por vez, a partir do offset `start`"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return
+            if start is not None:
+                f.seek(start)
+            file_size = os.fstat(f.fileno()).st_size
+            while True:
+                game_id = f.tell()
+                header = f.read(_U32.size)
+                if len(header) < _U32.size:
+                    return
+                size = _U32.unpack(header)[0]
+                if game_id + _U32.size + size > file_size:
+                    # Registro incompleto (gravação em andamento ou interrompida)
+                    return
+                yield game_id, size, decode(f, size)
+                f.seek(game_id + _U32.size + size)
+
+    def iter_summaries(self, room_name=None):
+        """Gera o resumo de cada jogo sem decodificar cartelas"""
+        def read_summary(f, size):
+            # O resumo ocupa no máximo ~790 bytes no início do payload
+            return decode_summary(_Reader(f.read(min(size, 1024))))
+
+        for game_id, _, summary in self._iter_raw(read_summary):
+            if room_name and summary['room_name'] != room_name:
+                continue
+            summary['game_id'] = game_id
+            yield summary
+
+    def _is_record(self, game_id):
+        """Confere se o id é o início de um registro do arquivo"""
+        with self._lock:
+            if game_id not in self._offsets and game_id >= self._indexed_end:
+                # Indexa só o que foi gravado desde a última consulta (inclusive por outro processo)
+                for offset, size, _ in self._iter_raw(lambda f, size: None, self._indexed_end):
+                    self._offsets.add(offset)
+                    self._indexed_end = offset + _U32.size + size
+            return game_id in self._offsets
+
+    def get_game(self, game_id):
+        """Carrega um único jogo pelo id (offset no arquivo)"""
+        if not self._is_record(game_id) or not os.path.exists(self.path):
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(game_id)
+            header = f.read(_U32.size)
+            if len(header) < _U32.size:
+                return None
+            payload = f.read(_U32.unpack(header)[0])
+        try:
+            game = decode_game(payload)
+        except (struct.error, UnicodeDecodeError, IndexError):
+            return None
+        game['game_id'] = game_id
+        return game
+
+
+def tier_required_lines(tier):
+    """Linhas completas exigidas pela etapa (padrão desconhecido vale cartela cheia)"""
+    return PRIZE_PATTERNS.get(tier['pattern'], len(CARD_LINES))
+
+
+def iter_replay(game):
+    """Gera um evento por número sorteado, com as cartelas que completaram
+
+    `bingos` são as cartelas cheias; `prizes` são as etapas conquistadas no
+    número, seguindo a mesma ordem de etapas do jogo.
+    """
+    tiers = game['tiers']
+    required = [tier_required_lines(tier) for tier in tiers]
+    remaining = {}  # {(nome, cartela): [bitmask da cartela, bitmask das linhas, linhas completas]}
+    for player in game['players']:
+        for index, card in enumerate(player['cards']):
+            remaining[(player['username'], index)] = [card_bitmask(card), card_line_masks(card), 0]
+
+    current_tier = 0
+    for draw_index, number in enumerate(game['numbers_drawn'], start=1):
+        bit = 1 << (number - 1)
+        completed = []
+        candidates = [[] for _ in tiers]
+        for key, state in remaining.items():
+            if not state[0] & bit:
+                continue
+            state[0] &= ~bit
+            lines = state[1]
+            before = state[2]
+            for line, mask in enumerate(lines):
+                if mask & bit:
+                    lines[line] = mask & ~bit
+                    if lines[line] == 0:
+                        state[2] += 1
+            for tier_index in range(current_tier, len(tiers)):
+                if before < required[tier_index] <= state[2]:
+                    candidates[tier_index].append({'username': key[0], 'card_index': key[1]})
+            if state[0] == 0:
+                completed.append({'username': key[0], 'card_index': key[1]})
+
+        prizes = []
+        while current_tier < len(tiers) and candidates[current_tier]:
+            prizes.append({
+                'tier': tiers[current_tier]['name'],
+                'pattern': tiers[current_tier]['pattern'],
+                'winners': candidates[current_tier]
+            })
+            current_tier += 1
+        yield {'draw': draw_index, 'number': number, 'bingos': completed, 'prizes': prizes}
+
+
+def verify_claim(game, username, card_index, tier_index=None):
+    """Verifica offline se a cartela atingiu a etapa com os números sorteados
+
+    Sem `tier_index`, verifica a última etapa (a que encerra o jogo).
+    """
+    tiers = game['tiers']
+    if tier_index is None:
+        tier_index = len(tiers) - 1
+    if not 0 <= tier_index < len(tiers):
+        return {'valid': False, 'reason': 'Etapa não encontrada neste jogo'}
+    player = next((p for p in game['players'] if p['username'] == username), None)
+    if player is None or not 0 <= card_index < len(player['cards']):
+        return {'valid': False, 'reason': 'Cartela não encontrada neste jogo'}
+
+    tier = tiers[tier_index]
+    required = tier_required_lines(tier)
+    lines = card_line_masks(player['cards'][card_index])
+    completed = 0
+    for draw_index, number in enumerate(game['numbers_drawn'], start=1):
+        bit = 1 << (number - 1)
+        for line, mask in enumerate(lines):
+            if mask & bit:
+                lines[line] = mask & ~bit
+                if lines[line] == 0:
+                    completed += 1
+        if completed >= required:
+            return {
+                'valid': True,
+                'tier': tier['name'],
+                'pattern': tier['pattern'],
+                'ball': number,
+                'draw_count': draw_index,
+                'is_recorded_winner': any(w['username'] == username and w['card_index'] == card_index
+                                          for w in tier['winners'])
+            }
+    return {'valid': False, 'reason': f"A cartela não atingiu a etapa {tier['name']} com os números sorteados"}
+
+
+def main(argv=None):
+    """Interface de linha de comando para consultar o histórico"""
+    parser = argparse.ArgumentParser(description='Histórico de jogos do Bingo da Golden Club')
+    parser.add_argument('path', help='Arquivo de histórico')
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_parser = sub.add_parser('list', help='Lista os jogos gravados')
+    list_parser.add_argument('--room', help='Filtra por sala')
+    replay_parser = sub.add_parser('replay', help='Reproduz o sorteio de um jogo')
+    replay_parser.add_argument('game_id', type=int)
+    verify_parser = sub.add_parser('verify', help='Verifica uma vitória')
+    verify_parser.add_argument('game_id', type=int)
+    verify_parser.add_argument('username')
+    verify_parser.add_argument('card_index', type=int)
+    verify_parser.add_argument('--tier', type=int, help='Índice da etapa (padrão: a última)')
+    args = parser.parse_args(argv)
+
+    history = GameHistory(args.path)
+    if args.command == 'list':
+        for summary in history.iter_summaries(args.room):
+            print(json.dumps(summary, ensure_ascii=False))
+        return 0
+
+    game = history.get_game(args.game_id)
+    if game is None:
+        print(f"Jogo {args.game_id} não encontrado", file=sys.stderr)
+        return 1
+    if args.command == 'replay':
+        for event in iter_replay(game):
+            print(json.dumps(event, ensure_ascii=False))
+    else:
+        result = verify_claim(game, args.username, args.card_index, args.tier)
+        print(json.dumps(result, ensure_ascii=False))
+        return 0 if result['valid'] else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,45 @@
 import random
+import threading
 import uuid
+from collections import deque
 from datetime import datetime
 
+# Linhas de uma cartela 5x5 (índices na lista da cartela): 5 colunas, 5 linhas e 2 diagonais
+CARD_LINES = (
+    [[col * 5 + row for row in range(5)] for col in range(5)] +
+    [[col * 5 + row for col in range(5)] for row in range(5)] +
+    [[i * 5 + i for i in range(5)], [i * 5 + (4 - i) for i in range(5)]]
+)
+# Linhas que passam por cada posição da cartela
+POSITION_LINES = [[line for line, cells in enumerate(CARD_LINES) if pos in cells] for pos in range(25)]
+
+# Limite de cartelas por jogador (o histórico grava a quantidade em um byte)
+MAX_CARDS_PER_PLAYER = 100
+
+# Padrões de prêmio: quantidade de linhas completas exigida (cartela cheia completa as 12)
+PRIZE_PATTERNS = {
+    'line': 1,
+    'two_lines': 2,
+    'three_lines': 3,
+    'full_house': len(CARD_LINES),
+}
+
+def parse_prize_tiers(tiers):
+    """Valida as etapas de premiação; retorna a configuração ou None se inválidas"""
+    config = []
+    previous = 0
+    for tier in tiers or []:
+        required = PRIZE_PATTERNS.get(tier.get('pattern')) if isinstance(tier, dict) else None
+        if required is None or required <= previous:
+            return None
+        previous = required
+        config.append({
+            'name': (tier.get('name') or tier['pattern']).strip(),
+            'pattern': tier['pattern'],
+            'prize': (tier.get('prize') or '').strip()
+        })
+    return config
+
 class User:
     def __init__(self, username):
         self.username = username
@@ -16,7 +54,7 @@ class User:
 
     def set_num_cards(self, num_cards):
         """Define o número de cartelas para o jogador"""
-        self.num_cards = max(1, num_cards)  # Mínimo 1 cartela
+        self.num_cards = min(max(1, num_cards), MAX_CARDS_PER_PLAYER)  # De 1 ao limite da sala
         # Inicializa os números marcados para cada cartela
         for i in range(self.num_cards):
             if i not in self.marked_numbers:
@@ -79,71 +117,117 @@ class Room:
         self.room_id = str(uuid.uuid4())
         self.admin_username = admin_username
         self.max_players = max_players
-        self.players = []
+        self.members = {}  # {username: User} - ordem de entrada define a sucessão do admin
+        self._player_names = None  # Cache da lista de nomes usada nos payloads
+        self.membership_version = 0  # Incrementada a cada entrada, saída ou troca de admin
+        self.state_version = 0  # Incrementada a cada mudança do estado visível (snapshots da API)
         self.numbers_drawn = []
         self.is_active = False
         self.created_at = datetime.now()
         self.winner = None
         self.game_started = False
+        self.started_at = None  # Momento em que o jogo atual começou
+        self.game_recorded = False  # Se o jogo atual já foi gravado no histórico
         self.player_cards_config = {}  # {username: num_cards} - Configuração de cartelas por jogador
         self.prize = ""  # Prêmio do jogo (opcional)
+        self.prize_tiers_config = []  # [{'name', 'pattern', 'prize'}] - vazio = apenas cartela cheia
+        self.prize_tiers = []  # Etapas do jogo atual, com seus vencedores
+        self.current_tier = 0  # Índice da próxima etapa a ser premiada
+        self._tiers_by_lines = {}  # {linhas exigidas: [índices das etapas]}
+        self.card_pool = deque()  # Cartelas pré-geradas aguardando distribuição
+        self.card_pool_slack = 10  # Cartelas extras mantidas além do total configurado
+        self._pool_lock = threading.Lock()
+        self.number_index = {}  # {número: {(jogador, índice_cartela): posição}} - cartelas que contêm cada número
+        self.cards_remaining = {}  # {(jogador, índice_cartela): números que faltam marcar}
+        self.lines_remaining = {}  # {(jogador, índice_cartela): [números que faltam em cada linha]}
+        self.lines_completed = {}  # {(jogador, índice_cartela): linhas completas}
+        self.tier_candidates = []  # Por etapa, cartelas que atingiram o padrão e ainda não foram premiadas
+        self.remaining_buckets = [dict() for _ in range(25)]  # Cartelas agrupadas por números restantes
+        self.leaderboard_size = 10  # Quantidade de cartelas enviadas no ranking
+        self.tournament = None  # Nome do torneio que sorteia os números desta sala
+
+    def touch(self):
+        """Marca o estado da sala como alterado (invalida os snapshots da API)"""
+        self.state_version += 1
+
+    @property
+    def players(self):
+        """Jogadores da sala, em ordem de entrada (cópia: segura para percorrer)"""
+        return list(self.members.values())
+
+    @property
+    def player_names(self):
+        """Lista de nomes dos jogadores (em cache até a próxima entrada/saída)"""
+        if self._player_names is None:
+            self._player_names = list(self.members)
+        return self._player_names
+
+    def has_player(self, username):
+        """Verifica se o jogador está na sala"""
+        return username in self.members
+
+    def get_player(self, username):
+        """Retorna o jogador da sala pelo nome, ou None"""
+        return self.members.get(username)
 
     def add_player(self, user):
         """Adiciona um jogador à sala"""
-        if len(self.players) < self.max_players and user not in self.players:
-            self.players.append(user)
+        if len(self.members) < self.max_players and user.username not in self.members:
+            self.members[user.username] = user
+            self._player_names = None
+            self.membership_version += 1
             user.room = self.room_name
             # Define o primeiro jogador como admin se não houver admin
-            if len(self.players) == 1:
+            # (em sala de torneio o admin do torneio continua no comando)
+            if len(self.members) == 1 and not self.tournament:
                 user.is_admin = True
                 self.admin_username = user.username
             # Inicializa com 1 cartela por padrão
             self.player_cards_config[user.username] = 1
             user.set_num_cards(1)
+            self.touch()
             return True
         return False
 
     def remove_player(self, user):
         """Remove um jogador da sala"""
-        if user in self.players:
-            self.players.remove(user)
+        if self.members.pop(user.username, None) is not None:
+            self._player_names = None
+            self.membership_version += 1
+            self._unindex_player_cards(user)
             user.room = None
             user.is_admin = False
             # Remove configuração de cartelas
             if user.username in self.player_cards_config:
                 del self.player_cards_config[user.username]
-            # Se o admin saiu, define um novo admin
-            if user.username == self.admin_username and self.players:
-                self.players[0].is_admin = True
-                self.admin_username = self.players[0].username
+            # Se o admin saiu, o jogador mais antigo na sala vira admin (exceto em torneio)
+            if user.username == self.admin_username and self.members and not self.tournament:
+                successor = next(iter(self.members.values()))
+                successor.is_admin = True
+                self.admin_username = successor.username
+            self.touch()
             return True
         return False
 
     def set_player_cards(self, username, num_cards):
         """Define o número de cartelas para um jogador específico"""
-        if username in self.player_cards_config:
-            self.player_cards_config[username] = max(1, num_cards)
-            # Encontra o jogador e atualiza suas cartelas
-            for player in self.players:
-                if player.username == username:
-                    player.set_num_cards(num_cards)
-                    # Se o jogo já começou, gera novas cartelas
-                    if self.game_started:
-                        self.generate_cards_for_player(player)
-                    return True
+        player = self.members.get(username)
+        if not isinstance(num_cards, int) or not 1 <= num_cards <= MAX_CARDS_PER_PLAYER:
+            return False
+        if player is not None and username in self.player_cards_config:
+            self.player_cards_config[username] = num_cards
+            player.set_num_cards(num_cards)
+            # Se o jogo já começou, gera novas cartelas
+            if self.game_started:
+                self.generate_cards_for_player(player)
+            self.touch()
+            return True
         return False
 
     def transfer_admin(self, new_admin_username):
         """Transfere admin para outro jogador"""
-        # Encontra o jogador atual admin
-        current_admin = None
-        new_admin = None
-        
-        for player in self.players:
-            if player.is_admin:
-                current_admin = player
-            if player.username == new_admin_username:
-                new_admin = player
+        current_admin = self.members.get(self.admin_username)
+        new_admin = self.members.get(new_admin_username)
         
         # Verifica se o novo admin existe na sala
         if new_admin and current_admin:
@@ -152,6 +236,8 @@ class Room:
             # Define novo admin
             new_admin.is_admin = True
             self.admin_username = new_admin_username
+            self.membership_version += 1
+            self.touch()
             return True
         return False
 
@@ -170,8 +256,43 @@ class Room:
     def set_prize(self, prize):
         """Define o prêmio do jogo"""
         self.prize = prize if prize else ""
+        self.touch()
         return True
 
+    def set_prize_tiers(self, tiers):
+        """Define as etapas de premiação (ex.: linha, duas linhas, cartela cheia)
+
+        As etapas são premiadas em ordem e cada uma deve exigir mais linhas que a
+        anterior. O jogo termina quando a última etapa é conquistada.
+        """
+        if self.game_started:
+            return False
+        config = parse_prize_tiers(tiers)
+        if config is None:
+            return False
+        self.prize_tiers_config = config
+        self.touch()
+        return True
+
+    def _build_prize_tiers(self):
+        """Cria as etapas do jogo atual a partir da configuração"""
+        config = self.prize_tiers_config or [
+            {'name': 'Bingo', 'pattern': 'full_house', 'prize': self.prize}
+        ]
+        self.prize_tiers = [dict(tier, winners=[]) for tier in config]
+        self.current_tier = 0
+        self.tier_candidates = [[] for _ in self.prize_tiers]
+        # Linhas exigidas -> índices das etapas, para avaliar só quando uma linha completa
+        self._tiers_by_lines = {}
+        for index, tier in enumerate(self.prize_tiers):
+            self._tiers_by_lines.setdefault(PRIZE_PATTERNS[tier['pattern']], []).append(index)
+
+    def get_prize_tiers(self):
+        """Retorna as etapas configuradas ou em andamento"""
+        if self.prize_tiers:
+            return self.prize_tiers
+        return [dict(tier, winners=[]) for tier in self.prize_tiers_config]
+
     def generate_card(self):
         """Gera uma cartela única de bingo (5x5 com centro livre)"""
         card = []
@@ -187,21 +308,143 @@ class Room:
         
         return card
 
+    def card_pool_target(self):
+        """Quantidade de cartelas que o pool deve manter prontas"""
+        return sum(self.player_cards_config.values()) + self.card_pool_slack
+
+    def refill_card_pool(self):
+        """Completa o pool de cartelas até o alvo (executado em segundo plano)"""
+        # Evita dois reabastecimentos simultâneos na mesma sala
+        if not self._pool_lock.acquire(blocking=False):
+            return 0
+        try:
+            generated = 0
+            while len(self.card_pool) < self.card_pool_target():
+                self.card_pool.append(self.generate_card())
+                generated += 1
+            return generated
+        finally:
+            self._pool_lock.release()
+
+    def take_card(self):
+        """Retira uma cartela do pool, gerando na hora se ele estiver vazio"""
+        try:
+            return self.card_pool.popleft()
+        except IndexError:
+            return self.generate_card()
+
+    def _index_player_cards(self, player):
+        """Adiciona as cartelas do jogador ao índice de números e ao ranking"""
+        for card_index, card in enumerate(player.cards):
+            key = (player, card_index)
+            marked = player.marked_numbers.get(card_index, set())
+            remaining = 0
+            lines = [0] * len(CARD_LINES)
+            for position, number in enumerate(card):
+                if number == 'FREE':
+                    continue
+                self.number_index.setdefault(number, {})[key] = position
+                if number not in marked:
+                    remaining += 1
+                    for line in POSITION_LINES[position]:
+                        lines[line] += 1
+            self.cards_remaining[key] = remaining
+            self.remaining_buckets[remaining][key] = None
+            self.lines_remaining[key] = lines
+            self.lines_completed[key] = 0
+            for _ in range(lines.count(0)):
+                self._complete_line(key)
+
+    def _unindex_player_cards(self, player):
+        """Remove as cartelas do jogador do índice de números e do ranking"""
+        for card_index, card in enumerate(player.cards):
+            key = (player, card_index)
+            for number in card:
+                if number != 'FREE' and number in self.number_index:
+                    self.number_index[number].pop(key, None)
+            remaining = self.cards_remaining.pop(key, None)
+            if remaining is not None:
+                self.remaining_buckets[remaining].pop(key, None)
+            self.lines_remaining.pop(key, None)
+            self.lines_completed.pop(key, None)
+            for candidates in self.tier_candidates:
+                if key in candidates:
+                    candidates.remove(key)
+
+    def _clear_card_index(self):
+        """Limpa o índice de números e o ranking"""
+        self.number_index = {}
+        self.cards_remaining = {}
+        self.remaining_buckets = [dict() for _ in range(25)]
+        self.lines_remaining = {}
+        self.lines_completed = {}
+        self.tier_candidates = [[] for _ in self.prize_tiers]
+
+    def _complete_line(self, key):
+        """Conta uma linha completa e registra a cartela nas etapas que ela passa a atingir"""
+        completed = self.lines_completed[key] + 1
+        self.lines_completed[key] = completed
+        for tier_index in self._tiers_by_lines.get(completed, ()):
+            if tier_index >= self.current_tier:
+                self.tier_candidates[tier_index].append(key)
+
+    def mark_number(self, number):
+        """Marca um número apenas nas cartelas que o contêm e atualiza ranking e etapas"""
+        hits = []
+        for key, position in self.number_index.get(number, {}).items():
+            player, card_index = key
+            marked = player.marked_numbers.setdefault(card_index, set())
+            if number in marked:
+                continue
+            marked.add(number)
+            remaining = self.cards_remaining[key]
+            # Move a cartela para o balde com um número a menos
+            del self.remaining_buckets[remaining][key]
+            self.cards_remaining[key] = remaining - 1
+            self.remaining_buckets[remaining - 1][key] = None
+            # Atualiza apenas as linhas que passam por esta posição
+            lines = self.lines_remaining[key]
+            for line in POSITION_LINES[position]:
+                lines[line] -= 1
+                if lines[line] == 0:
+                    self._complete_line(key)
+            hits.append(key)
+        self.touch()
+        return hits
+
+    def get_leaderboard(self, top_n=None):
+        """Retorna as cartelas mais perto do bingo, sem percorrer todas as cartelas"""
+        top_n = self.leaderboard_size if top_n is None else top_n
+        leaderboard = []
+        for remaining, bucket in enumerate(self.remaining_buckets):
+            for player, card_index in bucket:
+                if len(leaderboard) >= top_n:
+                    return leaderboard
+                leaderboard.append({
+                    'username': player.username,
+                    'card_index': card_index,
+                    'remaining': remaining
+                })
+        return leaderboard
+
     def generate_cards_for_player(self, player):
-        """Gera cartelas para um jogador específico"""
+        """Distribui cartelas do pool para um jogador específico"""
         num_cards = self.player_cards_config.get(player.username, 1)
         print(f"[DEBUG] Gerando {num_cards} cartelas para {player.username}")
+        self._unindex_player_cards(player)
         player.cards = []
         player.marked_numbers = {}
         
         for i in range(num_cards):
-            card = self.generate_card()
+            card = self.take_card()
             player.cards.append(card)
             player.marked_numbers[i] = set()
             # Marca automaticamente o centro livre
             if 'FREE' in card:
                 player.marked_numbers[i].add('FREE')
         
+        self._index_player_cards(player)
+        self.touch()
         print(f"[DEBUG] {player.username} agora tem {len(player.cards)} cartelas")
 
     def draw_number(self):
@@ -212,9 +455,18 @@ class Room:
         if remaining:
             number = random.choice(remaining)
             self.numbers_drawn.append(number)
+            self.touch()
             return number
         return None
 
+    def call_number(self, number):
+        """Registra um número sorteado fora da sala (baralho do torneio)"""
+        if number in self.numbers_drawn:
+            return None
+        self.numbers_drawn.append(number)
+        self.touch()
+        return number
+
     def get_room_info(self):
         """Retorna informações da sala"""
         total_cards = sum(self.player_cards_config.values())
@@ -222,7 +474,7 @@ class Room:
             'room_name': self.room_name,
             'room_id': self.room_id,
             'admin': self.admin_username,
-            'players_count': len(self.players),
+            'players_count': len(self.members),
             'max_players': self.max_players,
             'is_active': self.is_active,
             'game_started': self.game_started,
@@ -230,21 +482,54 @@ class Room:
             'winner': self.winner,
             'total_cards': total_cards,
             'players_config': self.get_player_cards_config(),
-            'prize': self.prize
+            'prize': self.prize,
+            'prize_tiers': self.get_prize_tiers(),
+            'current_tier': self.current_tier,
+            'tournament': self.tournament
         }
 
-    def check_winner(self):
-        """Verifica se algum jogador fez bingo em alguma cartela"""
-        for player in self.players:
-            winning_cards = player.get_winning_cards()
-            if winning_cards:
-                self.winner = {
+    def evaluate_prizes(self):
+        """Premia as etapas atingidas no último número sorteado
+
+        Usa as cartelas registradas por `mark_number`, sem percorrer todas as
+        cartelas. Várias etapas podem ser conquistadas no mesmo número.
+        """
+        claimed = []
+        ball = self.numbers_drawn[-1] if self.numbers_drawn else None
+        while self.current_tier < len(self.prize_tiers) and self.tier_candidates[self.current_tier]:
+            tier = self.prize_tiers[self.current_tier]
+            for player, card_index in self.tier_candidates[self.current_tier]:
+                tier['winners'].append({
                     'username': player.username,
-                    'winning_cards': winning_cards,
-                    'total_cards': len(player.cards)
-                }
-                self.is_active = False
-                return player
+                    'card_index': card_index,
+                    'ball': ball,
+                    'draw_count': len(self.numbers_drawn)
+                })
+            self.tier_candidates[self.current_tier] = []
+            claimed.append(tier)
+            self.current_tier += 1
+
+        # A última etapa encerra o jogo
+        if claimed and self.current_tier == len(self.prize_tiers):
+            final_winners = self.prize_tiers[-1]['winners']
+            username = final_winners[0]['username']
+            self.winner = {
+                'username': username,
+                'winning_cards': [w['card_index'] for w in final_winners if w['username'] == username],
+                'total_cards': len(self.members[username].cards) if username in self.members else 0,
+                'ball': ball,
+                'draw_count': len(self.numbers_drawn)
+            }
+            self.is_active = False
+        if claimed:
+            self.touch()
+        return claimed
+
+    def check_winner(self):
+        """Avalia as etapas e retorna o jogador que conquistou a última, se houver"""
+        self.evaluate_prizes()
+        if self.winner:
+            return self.members.get(self.winner['username'])
         return None
 
     def reset_game(self):
@@ -253,17 +538,29 @@ class Room:
         self.winner = None
         self.is_active = False
         self.game_started = False
+        self.started_at = None
+        self.game_recorded = False
+        self.prize_tiers = []
+        self.current_tier = 0
+        self._clear_card_index()
         
-        # Gera novas cartelas para todos os jogadores
+        # Descarta as cartelas antigas; as novas saem do pool no próximo início
         for player in self.players:
-            self.generate_cards_for_player(player)
+            player.cards = []
+            player.marked_numbers = {}
+            player.set_num_cards(self.player_cards_config.get(player.username, 1))
+        self.touch()
 
     def start_game(self):
         """Inicia o jogo"""
-        if len(self.players) >= 1:  # Mínimo 1 jogador para testar
+        if len(self.members) >= 1:  # Mínimo 1 jogador para testar
             self.game_started = True
             self.is_active = True
-            # Gera cartelas para todos os jogadores baseado na configuração
+            self.started_at = datetime.now()
+            self.game_recorded = False
+            self._build_prize_tiers()
+            self.touch()
+            # Distribui cartelas pré-geradas para todos os jogadores
             for player in self.players:
                 self.generate_cards_for_player(player)
             return True
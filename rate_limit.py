@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Limite de eventos por conexão (token bucket) do Bingo da Golden Club
+
+Cada sid tem um balde de tokens por evento. Um evento consome um token; os
+tokens voltam a uma taxa fixa até o limite de rajada. Quando o balde está
+vazio o cliente recebe `rate_limited` em vez de executar o handler. As
+violações se acumulam e escoam com o tempo (todas em `violation_window`
+segundos); só um cliente que continua excedendo o limite chega a
+`max_violations` e tem a conexão encerrada.
+
+O estado fica em uma tabela {sid: _SidState} consultada em O(1) a cada
+evento e removida no `disconnect`, então o custo por evento não cresce com
+o número de conexões.
+"""
+
+import functools
+import threading
+import time
+
+from transport import current_sid, disconnect, emit
+
+
+class _SidState:
+    __slots__ = ('buckets', 'violations', 'last_violation')
+
+    def __init__(self):
+        self.buckets = {}  # {evento: [tokens, último_abastecimento]}
+        self.violations = 0
+        self.last_violation = 0.0
+
+
+class RateLimiter:
+    def __init__(self, max_violations=20, violation_window=60.0):
+        self.max_violations = max_violations  # Violações acumuladas antes de desconectar
+        self.violation_window = violation_window  # Segundos para escoar todas as violações
+        self._state = {}  # {sid: _SidState}
+        self._lock = threading.Lock()
+
+    def limit(self, rate, burst, event=None):
+        """Decorador: permite `rate` eventos/s por sid, com rajadas de até `burst`"""
+        def decorator(handler):
+            name = event or handler.__name__.replace('handle_', '', 1)
+
+            @functools.wraps(handler)
+            def wrapper(*args, **kwargs):
+                sid = current_sid()
+                retry_after = self.consume(sid, name, rate, burst)
+                if retry_after is None:
+                    return handler(*args, **kwargs)
+                self._throttle(sid, name, retry_after)
+                return None
+            return wrapper
+        return decorator
+
+    def consume(self, sid, event, rate, burst):
+        """Consome um token; retorna None se permitido ou os segundos até o próximo token"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(sid)
+            if state is None:
+                state = self._state[sid] = _SidState()
+            bucket = state.buckets.get(event)
+            if bucket is None:
+                bucket = state.buckets[event] = [float(burst), now]
+            else:
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return None
+            return (1 - bucket[0]) / rate
+
+    def _throttle(self, sid, event, retry_after):
+        """Responde ao cliente limitado e desconecta conexões abusivas"""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(sid)
+            if state is None:
+                return
+            # Escoa as violações antigas na taxa max_violations / violation_window
+            drained = (now - state.last_violation) * self.max_violations / self.violation_window
+            state.violations = max(0.0, state.violations - drained) + 1
+            state.last_violation = now
+            abusive = state.violations >= self.max_violations
+
+        if abusive:
+            print(f"[DEBUG] Desconectando {sid}: excesso de eventos '{event}'")
+            self.forget(sid)
+            disconnect()
+            return
+        emit('rate_limited', {
+            'event': event,
+            'retry_after': round(retry_after, 2),
+            'message': 'Muitas solicitações, aguarde um instante'
+        })
+
+    def forget(self, sid):
+        """Remove o estado de um sid (chamado no disconnect)"""
+        with self._lock:
+            self._state.pop(sid, None)
+
+    def __len__(self):
+        return len(self._state)
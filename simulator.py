@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Simulador de probabilidades do Bingo da Golden Club
+
+Roda milhões de jogos sem servidor para medir quanto cada cartela extra
+(dada por check-in em `set_player_cards`) aumenta a chance de vitória e
+quantos números um jogo costuma levar.
+
+As cartelas seguem a mesma regra de `Room.generate_card` (5 números por
+coluna B/I/N/G/O, centro livre), mas são geradas e avaliadas em lote com
+NumPy. Os jogos são divididos em blocos executados em um pool de processos
+e os resultados ficam em cache por (jogadores, distribuição de cartelas,
+padrão).
+
+Uso:
+    python simulator.py --distribution 1x20,2x5,3x2 --games 1000000
+    python simulator.py --distribution 1,1,2,4 --pattern line
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from models import CARD_LINES, PRIZE_PATTERNS
+
+FREE_POSITION = 12  # Centro da cartela (coluna N, terceira posição)
+LINES = np.array(CARD_LINES)  # (12, 5) índices das células de cada linha
+CELLS_PER_BATCH = 2_000_000  # Limite de (jogos x cartelas x 25) por lote, controla a memória
+GAMES_PER_CHUNK = 50_000  # Jogos por tarefa enviada ao pool de processos
+
+_cache = {}  # {(jogadores, distribuição, padrão): resultado}
+_cache_lock = threading.Lock()
+
+
+def generate_cards(rng, games, num_cards):
+    """Gera cartelas como Room.generate_card, em lote (números 0-74, ordem por coluna)"""
+    # Para cada coluna, os 5 primeiros de uma permutação aleatória dos seus 15 números
+    keys = rng.random((games, num_cards, 5, 15), dtype=np.float32)
+    picks = np.argsort(keys, axis=-1)[..., :5].astype(np.int8)
+    numbers = picks + (np.arange(5, dtype=np.int8) * 15)[:, None]
+    return numbers.reshape(games, num_cards, 25)
+
+
+def simulate_batch(rng, card_counts, required_lines, games):
+    """Simula um lote de jogos e retorna vitórias por jogador e duração dos jogos"""
+    num_cards = int(sum(card_counts))
+    cards = generate_cards(rng, games, num_cards)
+
+    # rank[g, n] = em que sorteio (1-75) o número n saiu no jogo g
+    order = np.argsort(rng.random((games, 75), dtype=np.float32), axis=1)
+    rank = np.empty_like(order, dtype=np.int8)
+    np.put_along_axis(rank, order, np.arange(1, 76, dtype=np.int8)[None, :], axis=1)
+
+    # Momento em que cada célula é marcada; o centro livre já nasce marcado
+    cell_times = np.take_along_axis(rank[:, None, :], cards.reshape(games, 1, -1), axis=2)
+    cell_times = cell_times.reshape(games, num_cards, 25)
+    cell_times[:, :, FREE_POSITION] = 0
+
+    # Cada linha completa quando sua última célula é marcada
+    line_times = cell_times[:, :, LINES].max(axis=-1)
+    if required_lines >= len(CARD_LINES):
+        card_times = line_times.max(axis=-1)
+    else:
+        card_times = np.partition(line_times, required_lines - 1, axis=-1)[..., required_lines - 1]
+
+    game_times = card_times.min(axis=1)
+    winners = (card_times == game_times[:, None]).astype(np.int16)
+
+    # Agrupa as cartelas por dono (as cartelas de cada jogador são contíguas)
+    offsets = np.concatenate(([0], np.cumsum(card_counts)[:-1]))
+    winning_cards = np.add.reduceat(winners, offsets, axis=1)
+    total_winning = winning_cards.sum(axis=1, keepdims=True)
+    return {
+        'games': games,
+        'wins': (winning_cards > 0).sum(axis=0).astype(np.int64),
+        'shares': (winning_cards / total_winning).sum(axis=0),
+        'length_hist': np.bincount(game_times, minlength=76)[:76].astype(np.int64),
+    }
+
+
+def _run_chunk(card_counts, required_lines, games, seed):
+    """Tarefa do pool: simula `games` jogos em lotes que cabem na memória"""
+    rng = np.random.default_rng(seed)
+    batch = max(1, CELLS_PER_BATCH // (int(sum(card_counts)) * 25))
+    total = None
+    remaining = games
+    while remaining > 0:
+        result = simulate_batch(rng, card_counts, required_lines, min(batch, remaining))
+        remaining -= result['games']
+        total = result if total is None else _merge(total, result)
+    return total
+
+
+def _merge(a, b):
+    return {key: a[key] + b[key] for key in a}
+
+
+def summarize(card_counts, result):
+    """Monta as curvas de probabilidade por quantidade de cartelas"""
+    games = result['games']
+    counts = np.asarray(card_counts)
+    curve = []
+    for num_cards in sorted(set(card_counts)):
+        players = counts == num_cards
+        win_probability = float(result['wins'][players].mean() / games)
+        curve.append({
+            'cards': int(num_cards),
+            'players': int(players.sum()),
+            'win_probability': round(win_probability, 6),
+            'prize_share': round(float(result['shares'][players].mean() / games), 6),
+            'per_card_probability': round(win_probability / num_cards, 6),
+        })
+
+    hist = result['length_hist']
+    draws = np.arange(len(hist))
+    cumulative = np.cumsum(hist) / games
+    return {
+        'games': games,
+        'players': len(card_counts),
+        'total_cards': int(counts.sum()),
+        'curve': curve,
+        'expected_draws': round(float((draws * hist).sum() / games), 3),
+        'draws_p50': int(np.searchsorted(cumulative, 0.5)),
+        'draws_p90': int(np.searchsorted(cumulative, 0.9)),
+    }
+
+
+def cached_result(card_counts, pattern, games):
+    """Resultado em cache com pelo menos `games` jogos, ou None"""
+    card_counts = sorted(max(1, int(n)) for n in card_counts)
+    with _cache_lock:
+        cached = _cache.get((len(card_counts), tuple(card_counts), pattern))
+    if cached is not None and cached['games'] >= games:
+        return cached
+    return None
+
+
+def simulate(card_counts, pattern='full_house', games=100_000, workers=None, seed=None, executor=None):
+    """Simula `games` jogos para a distribuição de cartelas informada (uma entrada por jogador)
+
+    Resultados ficam em cache por (jogadores, distribuição, padrão); um resultado
+    em cache com pelo menos `games` jogos é reaproveitado. Com `executor` (um
+    `workers.BoundedExecutor`), os blocos vão para o pool do servidor de uma
+    vez só: se não houver espaço para todos, levanta PoolFull sem enviar nenhum.
+    """
+    if pattern not in PRIZE_PATTERNS:
+        raise ValueError(f"Padrão desconhecido: {pattern}")
+    card_counts = sorted(max(1, int(n)) for n in card_counts)
+    if not card_counts:
+        raise ValueError("É preciso pelo menos um jogador")
+
+    cached = cached_result(card_counts, pattern, games)
+    if cached is not None:
+        return cached
+
+    required_lines = PRIZE_PATTERNS[pattern]
+    chunks = [GAMES_PER_CHUNK] * (games // GAMES_PER_CHUNK)
+    if games % GAMES_PER_CHUNK:
+        chunks.append(games % GAMES_PER_CHUNK)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    if len(chunks) == 1 and executor is None:
+        result = _run_chunk(card_counts, required_lines, chunks[0], seeds[0])
+    else:
+        args = [(card_counts, required_lines, size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+        pool = executor or ProcessPoolExecutor(max_workers=workers)
+        futures = []
+        try:
+            if executor is not None:
+                futures = executor.submit_batch(_run_chunk, args)
+            else:
+                futures = [pool.submit(_run_chunk, *chunk_args) for chunk_args in args]
+            result = None
+            for future in futures:
+                chunk = future.result()
+                result = chunk if result is None else _merge(result, chunk)
+        finally:
+            # Em caso de falha, os blocos ainda na fila não rodam à toa
+            for future in futures:
+                future.cancel()
+            if executor is None:
+                pool.shutdown()
+
+    summary = summarize(card_counts, result)
+    summary['pattern'] = pattern
+    with _cache_lock:
+        _cache[(len(card_counts), tuple(card_counts), pattern)] = summary
+    return summary
+
+
+def parse_distribution(text):
+    """Converte '1x20,2x5,3' em uma lista de cartelas por jogador"""
+    card_counts = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        num_cards, _, players = item.partition('x')
+        card_counts.extend([int(num_cards)] * int(players or 1))
+    return card_counts
+
+
+def main(argv=None):
+    """Interface de linha de comando do simulador"""
+    parser = argparse.ArgumentParser(description='Simulador de probabilidades do Bingo da Golden Club')
+    parser.add_argument('--distribution', required=True,
+                        help="Cartelas por jogador, ex.: '1x20,2x5,3x2' ou '1,1,2,4'")
+    parser.add_argument('--pattern', default='full_house', choices=sorted(PRIZE_PATTERNS))
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    summary = simulate(parse_distribution(args.distribution), args.pattern, args.games,
+                       workers=args.workers, seed=args.seed)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Snapshots do estado das salas para a API de consulta do Bingo da Golden Club
+
+Clientes em long-polling e overlays de transmissão consultam o estado da
+sala repetidamente. O JSON de cada sala (e das cartelas de cada jogador) é
+serializado uma vez por versão (`Room.state_version`) e reaproveitado até a
+próxima mudança; a versão vira o ETag, então uma consulta sem mudanças
+responde 304 sem montar nada.
+
+Com `?since=<quantidade de números>` só os números sorteados depois disso
+são enviados, anexados ao snapshot já serializado.
+"""
+
+import json
+import threading
+import weakref
+
+from flask import Response, request
+
+_snapshots = weakref.WeakKeyDictionary()  # {Room: {variante: (versão, snapshot)}}
+_lock = threading.Lock()
+
+
+def _cached(room, variant, build):
+    """Snapshot da variante na versão atual da sala, serializando só se mudou"""
+    with _lock:
+        entries = _snapshots.setdefault(room, {})
+    version = room.state_version
+    entry = entries.get(variant)
+    if entry is not None and entry[0] == version:
+        return version, entry[1]
+
+    for _ in range(3):
+        try:
+            snapshot = build()
+            break
+        except RuntimeError:
+            # Um sorteio alterou a sala durante a leitura; tenta de novo
+            version = room.state_version
+    else:
+        snapshot = build()
+    entries[variant] = (version, snapshot)
+    return version, snapshot
+
+
+def _build_state(room):
+    room_info = room.get_room_info()
+    numbers = list(room_info.pop('numbers_drawn'))
+    head = json.dumps({
+        'room_info': room_info,
+        'players': list(room.player_names),
+        'leaderboard': room.get_leaderboard(),
+        'draw_count': len(numbers),
+        'last_number': numbers[-1] if numbers else None
+    }, ensure_ascii=False)
+    full = f'{head[:-1]}, "since": 0, "numbers_drawn": {json.dumps(numbers)}}}'.encode('utf-8')
+    return head, numbers, full
+
+
+def state_snapshot(room, since=0):
+    """(ETag, corpo JSON) do estado da sala; com `since`, só os números novos"""
+    version, (head, numbers, full) = _cached(room, 'state', lambda: _build_state(room))
+    etag = f"{room.room_id}-{version}"
+    # since maior que o total: o jogo foi reiniciado, envia a lista completa
+    if since <= 0 or since > len(numbers):
+        return etag, full
+    body = f'{head[:-1]}, "since": {since}, "numbers_drawn": {json.dumps(numbers[since:])}}}'
+    return f"{etag}-{since}", body.encode('utf-8')
+
+
+def cards_snapshot(room, player):
+    """(ETag, corpo JSON) das cartelas de um jogador da sala"""
+    def build():
+        return json.dumps({
+            'username': player.username,
+            'draw_count': len(room.numbers_drawn),
+            'cards': player.get_cards_status()
+        }, ensure_ascii=False).encode('utf-8')
+
+    version, body = _cached(room, ('cards', player.username), build)
+    return f"{room.room_id}-{version}", body
+
+
+def conditional_response(etag, body, private=False):
+    """Resposta JSON com ETag: 304 se o cliente já tem esta versão"""
+    headers = {
+        'Cache-Control': 'private, no-cache' if private else 'no-cache',
+        'ETag': f'"{etag}"',
+    }
+    if etag in request.if_none_match:
+        return Response(status=304, headers=headers)
+    return Response(body, mimetype='application/json', headers=headers)
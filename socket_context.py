@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Contexto por conexão dos handlers WebSocket do Bingo da Golden Club
+
+Todo handler precisava do mesmo preâmbulo: ler o usuário da sessão, buscar
+o User e a Room e checar se é admin. Aqui isso é resolvido uma vez por sid
+e guardado em cache; o handler recebe o contexto pronto.
+
+O cache é invalidado pela versão de membros da sala
+(`Room.membership_version`), incrementada quando alguém entra, sai ou o
+admin é transferido, e descartado no `disconnect`.
+"""
+
+import functools
+
+from transport import current_sid, emit, session_username
+
+
+class SocketContext:
+    __slots__ = ('user', 'room', 'room_name', 'is_admin', 'version')
+
+    def __init__(self, user, room):
+        self.user = user
+        self.room = room
+        self.room_name = room.room_name
+        self.is_admin = room.admin_username == user.username
+        self.version = room.membership_version
+
+    @property
+    def username(self):
+        return self.user.username
+
+
+class ContextCache:
+    def __init__(self, users, rooms):
+        self.users = users  # username: User object
+        self.rooms = rooms  # room_name: Room object
+        self._contexts = {}  # {sid: SocketContext}
+
+    def resolve(self, sid, room_name):
+        """Retorna o contexto da conexão para a sala, resolvendo só se necessário"""
+        ctx = self._contexts.get(sid)
+        if (ctx is not None and ctx.room_name == room_name
+                and ctx.version == ctx.room.membership_version
+                and self.rooms.get(room_name) is ctx.room):
+            return ctx
+
+        username = session_username()
+        user = self.users.get(username) if username else None
+        room = self.rooms.get(room_name)
+        if user is None or room is None:
+            self._contexts.pop(sid, None)
+            return None
+        ctx = self._contexts[sid] = SocketContext(user, room)
+        return ctx
+
+    def invalidate(self, sid):
+        """Descarta o contexto de uma conexão (chamado no disconnect)"""
+        self._contexts.pop(sid, None)
+
+    def handler(self, error=None, admin_error=None):
+        """Decorador: resolve o contexto e chama `handler(ctx, data)`
+
+        `error` é enviado se o usuário ou a sala não existirem (None = ignora em
+        silêncio) e `admin_error`, se informado, restringe o evento ao admin.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(data=None):
+                data = data or {}
+                ctx = self.resolve(current_sid(), data.get('room'))
+                if ctx is None:
+                    if error:
+                        emit('error', {'message': error})
+                    return None
+                if admin_error and not ctx.is_admin:
+                    emit('error', {'message': admin_error})
+                    return None
+                return func(ctx, data)
+            return wrapper
+        return decorator
+
+    def __len__(self):
+        return len(self._contexts)
@@ -0,0 +1,14 @@
+// Auto-refresh da página a cada 30 segundos para atualizar lista de salas
+setInterval(function() {
+    window.location.reload();
+}, 30000);
+
+// Animação de entrada das salas
+document.addEventListener('DOMContentLoaded', function() {
+    const roomCards = document.querySelectorAll('.room-card');
+
+    roomCards.forEach((card, index) => {
+        card.style.animationDelay = `${index * 0.1}s`;
+        card.classList.add('fade-in');
+    });
+});
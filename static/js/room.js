@@ -0,0 +1,768 @@
+// Configuração do WebSocket
+const templateData = JSON.parse(document.getElementById('template-data').textContent);
+const socket = io({
+    reconnection: true,
+    reconnectionAttempts: 2,
+    reconnectionDelay: 2000,
+    timeout: 10000,
+    forceNew: true
+});
+const roomName = templateData.roomName;
+const username = templateData.username;
+const isAdmin = templateData.isAdmin;
+
+let gameCards = [];
+let playersConfig = [];
+let isConnected = false;
+let gameStarted = false;
+let joinedRoom = false;  // Confirmado pelo primeiro game_state
+
+// Debug de conexão
+socket.on('connect', function() {
+    console.log('Socket conectado:', socket.id);
+    isConnected = true;
+    // Aguarda um pouco antes de entrar na sala
+    setTimeout(() => {
+        socket.emit('join_room', { room: roomName });
+    }, 500);
+});
+
+socket.on('disconnect', function(reason) {
+    console.log('Socket desconectado:', reason);
+    isConnected = false;
+    joinedRoom = false;
+});
+
+socket.on('reconnect', function() {
+    console.log('Socket reconectado');
+    isConnected = true;
+    // Reconecta à sala após reconexão
+    setTimeout(() => {
+        socket.emit('join_room', { room: roomName });
+    }, 500);
+});
+
+// Event Listeners do Socket
+socket.on('player_joined', function(data) {
+    updatePlayersList(data.players);
+    updatePlayersCount(data.players_count);
+    showNotification(`${data.username} entrou na sala`, 'info');
+
+    // Se eu me juntei à sala e me tornei admin, recarrega a página
+    if (data.username === username && data.is_admin && !isAdmin) {
+        setTimeout(() => {
+            location.reload();
+        }, 1000);
+    }
+});
+
+socket.on('player_left', function(data) {
+    updatePlayersCount(data.players_count);
+    if (data.players) {
+        updatePlayersList(data.players);
+    }
+    showNotification(`${data.username} saiu da sala`, 'warning');
+});
+
+socket.on('game_state', function(data) {
+    console.log('Recebido game_state:', data);
+    joinedRoom = true;
+
+    // Atualiza o status do jogo
+    if (data.room_info) {
+        gameStarted = data.room_info.game_started || false;
+    }
+
+    if (data.cards && data.cards.length > 0) {
+        console.log('Cartelas recebidas:', data.cards.length);
+        gameCards = data.cards;
+        renderBingoCards();
+    } else {
+        console.log('Nenhuma cartela recebida ou array vazio');
+    }
+
+    if (data.numbers_drawn) {
+        updateDrawnNumbers(data.numbers_drawn);
+    }
+
+    if (data.players) {
+        updatePlayersList(data.players);
+    }
+
+    if (data.players_count !== undefined) {
+        updatePlayersCount(data.players_count);
+    }
+
+    if (data.leaderboard) {
+        updateLeaderboard(data.leaderboard);
+    }
+
+    updateGameStatus(data.room_info);
+
+    if (isAdmin) {
+        loadPlayersConfig();
+    }
+});
+
+socket.on('game_started', function(data) {
+    gameStarted = true;
+    updateGameStatus(data.room_info);
+    showNotification('Jogo iniciado! Boa sorte!', 'success');
+
+    if (isAdmin) {
+        document.getElementById('startGameBtn').disabled = true;
+        document.getElementById('drawNumberBtn').disabled = false;
+    }
+
+    // Atualiza as cartelas para mostrar os números
+    renderBingoCards();
+});
+
+socket.on('number_drawn', function(data) {
+    addDrawnNumber(data.number);
+    updateNumbersDrawnCount(data.total_drawn, data.remaining);
+    showNotification(`Número sorteado: ${data.number}`, 'info');
+});
+
+socket.on('leaderboard', function(data) {
+    updateLeaderboard(data.leaderboard);
+});
+
+socket.on('card_updated', function(data) {
+    if (data.cards && data.cards.length > 0) {
+        gameCards = data.cards;
+        updateCardsDisplay();
+    }
+});
+
+socket.on('game_finished', function(data) {
+    showWinnerModal(data.winner, data.message);
+    updateGameStatus({ is_active: false, winner: data.winner });
+
+    if (isAdmin) {
+        document.getElementById('drawNumberBtn').disabled = true;
+    }
+});
+
+socket.on('game_reset', function(data) {
+    gameStarted = false;
+    resetGameDisplay();
+    showNotification('Jogo reiniciado!', 'info');
+
+    if (isAdmin) {
+        document.getElementById('startGameBtn').disabled = false;
+        document.getElementById('drawNumberBtn').disabled = true;
+    }
+
+    // Atualiza as cartelas para esconder os números novamente
+    renderBingoCards();
+});
+
+socket.on('error', function(data) {
+    showNotification(data.message, 'error');
+    // Servidor ocupado antes de entrar: tenta entrar de novo em alguns segundos
+    if (data.busy && !joinedRoom && isConnected) {
+        setTimeout(() => {
+            if (!joinedRoom && isConnected) {
+                socket.emit('join_room', { room: roomName });
+            }
+        }, 2000 + Math.random() * 2000);
+    }
+});
+
+socket.on('rate_limited', function(data) {
+    showNotification(data.message, 'warning');
+});
+
+socket.on('room_full', function(data) {
+    showNotification(data.message, 'error');
+    setTimeout(() => {
+        window.location.href = '/lobby';
+    }, 2000);
+});
+
+// Novos eventos para gerenciamento de cartelas
+socket.on('players_config', function(data) {
+    playersConfig = data.players;
+    renderPlayersConfig();
+});
+
+// O admin recebe players_config junto com as alterações de cartelas e check-ins
+socket.on('player_cards_updated', function(data) {
+    showNotification(`${data.username} agora tem ${data.num_cards} cartela(s)`, 'info');
+});
+
+socket.on('cards_regenerated', function(data) {
+    gameCards = data.cards;
+    renderBingoCards();
+    showNotification(data.message, 'success');
+});
+
+socket.on('check_ins_updated', function(data) {
+    showNotification(`Check-ins de ${data.username}: ${data.check_ins}`, 'info');
+});
+
+socket.on('admin_transferred', function(data) {
+    showNotification(data.message, 'success');
+
+    // Se eu era o admin e transferi para outro, recarrega a página
+    if (data.old_admin === username) {
+        setTimeout(() => {
+            location.reload();
+        }, 2000);
+    }
+    // Se eu recebi admin, recarrega a página
+    else if (data.new_admin === username) {
+        setTimeout(() => {
+            location.reload();
+        }, 2000);
+    }
+});
+
+socket.on('prize_claimed', function(data) {
+    showNotification(`🥇 ${data.message}`, 'success');
+    updatePrizeTiersDisplay(null, data.current_tier);
+});
+
+socket.on('prize_tiers_updated', function(data) {
+    updatePrizeTiersDisplay(data.prize_tiers, 0);
+    showNotification(data.message, 'success');
+});
+
+socket.on('prize_updated', function(data) {
+    updatePrizeDisplay(data.prize);
+    showNotification(data.message, 'success');
+});
+
+socket.on('tournament_created', function(data) {
+    updateTournamentBoard(data.tournament);
+    showNotification(data.message, 'success');
+});
+
+socket.on('tournament_board', function(data) {
+    updateTournamentBoard(data.tournament);
+});
+
+socket.on('tournament_cancelled', function(data) {
+    updateTournamentBoard(data.tournament);
+    showNotification(data.message, 'warning');
+});
+
+socket.on('tournament_finished', function(data) {
+    updateTournamentBoard(data.tournament);
+    showNotification(`🏟️ Torneio ${data.tournament.name} encerrado!`, 'success');
+});
+
+// Funções do Jogo
+function startGame() {
+    socket.emit('start_game', { room: roomName });
+}
+
+function drawNumber() {
+    socket.emit('draw_number', { room: roomName });
+}
+
+function resetGame() {
+    if (confirm('Tem certeza que deseja reiniciar o jogo?')) {
+        socket.emit('reset_game', { room: roomName });
+    }
+}
+
+// Funções de Gerenciamento de Cartelas
+function toggleCardsManager() {
+    const manager = document.getElementById('cardsManager');
+    if (manager.style.display === 'none') {
+        manager.style.display = 'block';
+        loadPlayersConfig();
+    } else {
+        manager.style.display = 'none';
+    }
+}
+
+let playersConfigTimer = null;
+
+function loadPlayersConfig() {
+    // Agrupa pedidos seguidos em um só
+    clearTimeout(playersConfigTimer);
+    playersConfigTimer = setTimeout(() => {
+        socket.emit('get_players_config', { room: roomName });
+    }, 300);
+}
+
+function setPlayerCards(username, numCards) {
+    socket.emit('set_player_cards', {
+        room: roomName,
+        username: username,
+        num_cards: parseInt(numCards)
+    });
+}
+
+function updateCheckIns(username, checkIns) {
+    socket.emit('update_check_ins', {
+        room: roomName,
+        username: username,
+        check_ins: parseInt(checkIns)
+    });
+}
+
+// Funções de Transferir Admin
+function toggleAdminTransfer() {
+    const adminTransfer = document.getElementById('adminTransfer');
+    if (adminTransfer.style.display === 'none') {
+        adminTransfer.style.display = 'block';
+        loadAdminPlayersList();
+    } else {
+        adminTransfer.style.display = 'none';
+    }
+}
+
+function loadAdminPlayersList() {
+    const adminPlayersList = document.getElementById('adminPlayersList');
+    adminPlayersList.innerHTML = '';
+
+    // Carrega lista de jogadores (exceto o admin atual)
+    playersConfig.forEach(player => {
+        if (player.username !== username && !player.is_admin) {
+            const playerElement = document.createElement('div');
+            playerElement.className = 'admin-player-item';
+            playerElement.innerHTML = `
+                <span class="player-name">${player.username}</span>
+                <button class="btn-transfer-to" onclick="transferAdminTo('${player.username}')">
+                    Transferir para ${player.username}
+                </button>
+            `;
+            adminPlayersList.appendChild(playerElement);
+        }
+    });
+
+    if (adminPlayersList.children.length === 0) {
+        adminPlayersList.innerHTML = '<p>Não há outros jogadores na sala para transferir admin.</p>';
+    }
+}
+
+function transferAdminTo(newAdminUsername) {
+    if (confirm(`Tem certeza que deseja transferir os privilégios de administrador para ${newAdminUsername}?`)) {
+        socket.emit('transfer_admin', {
+            room: roomName,
+            new_admin: newAdminUsername
+        });
+    }
+}
+
+// Funções de Gerenciamento de Prêmio
+function togglePrizeManager() {
+    const prizeManager = document.getElementById('prizeManager');
+    if (prizeManager.style.display === 'none') {
+        prizeManager.style.display = 'block';
+        // Carrega o prêmio atual no input
+        const currentPrize = document.getElementById('prizeValue').textContent;
+        if (currentPrize && currentPrize !== '-') {
+            document.getElementById('prizeInput').value = currentPrize;
+        }
+    } else {
+        prizeManager.style.display = 'none';
+    }
+}
+
+function setPrize() {
+    const prizeInput = document.getElementById('prizeInput');
+    const prize = prizeInput.value.trim();
+
+    socket.emit('set_prize', {
+        room: roomName,
+        prize: prize
+    });
+
+    // Fecha o gerenciador após definir
+    document.getElementById('prizeManager').style.display = 'none';
+}
+
+function setPrizeTiers() {
+    const tiers = [];
+    const linePrize = document.getElementById('tierLinePrize').value.trim();
+    const twoLinesPrize = document.getElementById('tierTwoLinesPrize').value.trim();
+    const fullHousePrize = document.getElementById('tierFullHousePrize').value.trim();
+
+    if (linePrize) {
+        tiers.push({ name: 'Linha', pattern: 'line', prize: linePrize });
+    }
+    if (twoLinesPrize) {
+        tiers.push({ name: 'Duas Linhas', pattern: 'two_lines', prize: twoLinesPrize });
+    }
+    // A cartela cheia é sempre a última etapa
+    tiers.push({ name: 'Cartela Cheia', pattern: 'full_house', prize: fullHousePrize });
+
+    socket.emit('set_prize_tiers', {
+        room: roomName,
+        tiers: tiers
+    });
+
+    document.getElementById('prizeManager').style.display = 'none';
+}
+
+function clearPrizeTiers() {
+    socket.emit('set_prize_tiers', {
+        room: roomName,
+        tiers: []
+    });
+
+    document.getElementById('prizeManager').style.display = 'none';
+}
+
+function clearPrize() {
+    if (confirm('Tem certeza que deseja remover o prêmio?')) {
+        socket.emit('set_prize', {
+            room: roomName,
+            prize: ''
+        });
+
+        // Limpa o input e fecha o gerenciador
+        document.getElementById('prizeInput').value = '';
+        document.getElementById('prizeManager').style.display = 'none';
+    }
+}
+
+// Funções de Torneio
+function toggleTournamentManager() {
+    const manager = document.getElementById('tournamentManager');
+    manager.style.display = manager.style.display === 'none' ? 'block' : 'none';
+}
+
+function createTournament() {
+    const name = document.getElementById('tournamentName').value.trim();
+    const rooms = document.getElementById('tournamentRooms').value
+        .split(',')
+        .map(room => room.trim())
+        .filter(room => room.length > 0);
+
+    socket.emit('create_tournament', {
+        tournament: name,
+        rooms: rooms
+    });
+}
+
+function startTournament() {
+    socket.emit('start_tournament', {
+        tournament: document.getElementById('tournamentName').value.trim()
+    });
+}
+
+function cancelTournament() {
+    const name = document.getElementById('tournamentName').value.trim();
+    if (confirm(`Cancelar o torneio ${name}? As salas voltam ao sorteio próprio.`)) {
+        socket.emit('cancel_tournament', { tournament: name });
+    }
+}
+
+function tournamentDraw() {
+    socket.emit('tournament_draw', {
+        tournament: document.getElementById('tournamentName').value.trim()
+    });
+}
+
+function updateTournamentBoard(tournament) {
+    document.getElementById('tournamentSection').style.display = 'block';
+    document.getElementById('tournamentTitle').textContent =
+        `🏟️ Torneio ${tournament.name} (${tournament.rooms.length} salas)`;
+    document.getElementById('tournamentBalls').textContent =
+        `Bolas: ${tournament.numbers_drawn.length}/75` +
+        (tournament.numbers_drawn.length ? ` - Última: ${tournament.numbers_drawn[tournament.numbers_drawn.length - 1]}` : '');
+
+    const winnersList = document.getElementById('tournamentWinnersList');
+    winnersList.innerHTML = '';
+
+    tournament.winners.forEach(winner => {
+        const winnerElement = document.createElement('div');
+        winnerElement.className = 'player-item leaderboard-item';
+        winnerElement.innerHTML = `
+            <span class="player-name">${winner.tier}: ${winner.username} (${winner.room})</span>
+            <span class="remaining">Bola ${winner.ball}</span>
+        `;
+        winnersList.appendChild(winnerElement);
+    });
+}
+
+// Funções de Interface para Múltiplas Cartelas
+function renderBingoCards() {
+    console.log('renderBingoCards chamada com', gameCards.length, 'cartelas');
+    const cardsContainer = document.getElementById('bingoCards');
+    cardsContainer.innerHTML = '';
+
+    document.getElementById('cardsCount').textContent = gameCards.length;
+
+    gameCards.forEach((cardData, cardIndex) => {
+        console.log('Renderizando cartela', cardIndex + 1, ':', cardData);
+        const cardElement = createCardElement(cardData, cardIndex);
+        cardsContainer.appendChild(cardElement);
+    });
+
+    console.log('Cartelas renderizadas no container:', cardsContainer.children.length);
+}
+
+function createCardElement(cardData, cardIndex) {
+    const cardWrapper = document.createElement('div');
+    cardWrapper.className = 'bingo-card-wrapper';
+
+    const cardHeader = document.createElement('div');
+    cardHeader.className = 'card-title';
+    cardHeader.innerHTML = `
+        <span>Cartela ${cardIndex + 1}</span>
+        ${cardData.is_winner ? '<span class="winner-badge">🏆 VENCEDORA!</span>' : ''}
+    `;
+
+    const bingoCard = document.createElement('div');
+    bingoCard.className = `bingo-card ${cardData.is_winner ? 'winner-card' : ''}`;
+
+    const letterHeader = document.createElement('div');
+    letterHeader.className = 'card-header';
+    letterHeader.innerHTML = `
+        <span class="letter">B</span>
+        <span class="letter">I</span>
+        <span class="letter">N</span>
+        <span class="letter">G</span>
+        <span class="letter">O</span>
+    `;
+
+    const cardGrid = document.createElement('div');
+    cardGrid.className = 'card-grid';
+
+    console.log('Criando cartela com números:', cardData.card);
+    cardData.card.forEach((number, cellIndex) => {
+        const cell = document.createElement('div');
+        cell.className = 'card-cell';
+
+        // Mostra números apenas se o jogo começou ou se é o próprio jogador
+        if (gameStarted || cardData.owner === username) {
+            cell.textContent = number;
+        } else {
+            cell.textContent = number === 'FREE' ? 'FREE' : '?';
+        }
+
+        console.log(`Célula ${cellIndex}: número ${number}, textContent: ${cell.textContent}`);
+
+        if (cardData.marked.includes(number) || number === 'FREE') {
+            cell.classList.add('marked');
+        }
+
+        if (number === 'FREE') {
+            cell.classList.add('free-space');
+            cell.textContent = 'FREE';
+        }
+
+        cardGrid.appendChild(cell);
+    });
+    console.log('Grid criado com', cardGrid.children.length, 'células');
+
+    const cardStats = document.createElement('div');
+    cardStats.className = 'card-stats';
+    cardStats.innerHTML = `
+        <span>Marcados: ${cardData.total_marked}</span>
+        <span>Total: ${cardData.total_numbers}</span>
+    `;
+
+    bingoCard.appendChild(letterHeader);
+    bingoCard.appendChild(cardGrid);
+
+    cardWrapper.appendChild(cardHeader);
+    cardWrapper.appendChild(bingoCard);
+    cardWrapper.appendChild(cardStats);
+
+    return cardWrapper;
+}
+
+function updateCardsDisplay() {
+    renderBingoCards();
+}
+
+function renderPlayersConfig() {
+    const configContainer = document.getElementById('playersConfig');
+    configContainer.innerHTML = '';
+
+    playersConfig.forEach(player => {
+        const playerConfig = document.createElement('div');
+        playerConfig.className = 'player-config';
+
+        playerConfig.innerHTML = `
+            <div class="player-info">
+                <span class="player-name">${player.username}</span>
+                ${player.is_admin ? '<span class="admin-badge">👑</span>' : ''}
+            </div>
+            <div class="config-controls">
+                <label>Check-ins:</label>
+                <input type="number" min="0" max="50" value="${player.check_ins}" 
+                       onchange="updateCheckIns('${player.username}', this.value)">
+
+                <label>Cartelas:</label>
+                <input type="number" min="1" max="10" value="${player.num_cards}" 
+                       onchange="setPlayerCards('${player.username}', this.value)">
+            </div>
+        `;
+
+        configContainer.appendChild(playerConfig);
+    });
+}
+
+function addDrawnNumber(number) {
+    const drawnNumbers = document.getElementById('drawnNumbers');
+    const numberElement = document.createElement('span');
+    numberElement.className = 'drawn-number';
+    numberElement.textContent = number;
+
+    drawnNumbers.appendChild(numberElement);
+
+    // Atualiza último número
+    document.getElementById('lastNumberValue').textContent = number;
+
+    // Scroll para o final
+    drawnNumbers.scrollTop = drawnNumbers.scrollHeight;
+}
+
+function updateDrawnNumbers(numbers) {
+    const drawnNumbers = document.getElementById('drawnNumbers');
+    drawnNumbers.innerHTML = '';
+
+    numbers.forEach(number => {
+        const numberElement = document.createElement('span');
+        numberElement.className = 'drawn-number';
+        numberElement.textContent = number;
+        drawnNumbers.appendChild(numberElement);
+    });
+
+    if (numbers.length > 0) {
+        document.getElementById('lastNumberValue').textContent = numbers[numbers.length - 1];
+    }
+}
+
+function updatePlayersList(players) {
+    const playersList = document.getElementById('playersList');
+    playersList.innerHTML = '';
+
+    players.forEach(player => {
+        const playerElement = document.createElement('div');
+        playerElement.className = 'player-item';
+        playerElement.innerHTML = `
+            <span class="player-name">${player}</span>
+            ${player === username && isAdmin ? '<span class="admin-badge">👑</span>' : ''}
+        `;
+        playersList.appendChild(playerElement);
+    });
+}
+
+function updateLeaderboard(leaderboard) {
+    const leaderboardList = document.getElementById('leaderboardList');
+    leaderboardList.innerHTML = '';
+
+    leaderboard.forEach(entry => {
+        const entryElement = document.createElement('div');
+        entryElement.className = 'player-item leaderboard-item';
+        entryElement.innerHTML = `
+            <span class="player-name">${entry.username} - Cartela ${entry.card_index + 1}</span>
+            <span class="remaining">Faltam ${entry.remaining}</span>
+        `;
+        leaderboardList.appendChild(entryElement);
+    });
+}
+
+function updatePlayersCount(count) {
+    document.getElementById('playersCount').textContent = `${count}/50`;
+}
+
+function updateNumbersDrawnCount(drawn, remaining) {
+    document.getElementById('numbersDrawn').textContent = `${drawn}/75`;
+}
+
+function updateGameStatus(roomInfo) {
+    const statusElement = document.getElementById('gameStatus');
+
+    if (roomInfo.winner) {
+        statusElement.textContent = 'Finalizado';
+        statusElement.className = 'status-value game-finished';
+    } else if (roomInfo.is_active) {
+        statusElement.textContent = 'Em Jogo';
+        statusElement.className = 'status-value game-active';
+    } else if (roomInfo.game_started) {
+        statusElement.textContent = 'Pausado';
+        statusElement.className = 'status-value game-paused';
+    } else {
+        statusElement.textContent = 'Aguardando';
+        statusElement.className = 'status-value game-waiting';
+    }
+
+    // Atualiza o prêmio se disponível
+    if (roomInfo.prize !== undefined) {
+        updatePrizeDisplay(roomInfo.prize);
+    }
+
+    if (roomInfo.prize_tiers !== undefined) {
+        updatePrizeTiersDisplay(roomInfo.prize_tiers, roomInfo.current_tier);
+    }
+}
+
+let prizeTiers = [];
+
+function updatePrizeTiersDisplay(tiers, currentTier) {
+    if (tiers) {
+        prizeTiers = tiers;
+    }
+    const tiersStatus = document.getElementById('prizeTiersStatus');
+    const tiersValue = document.getElementById('prizeTiersValue');
+
+    // Uma única etapa equivale ao prêmio simples
+    if (prizeTiers.length <= 1) {
+        tiersStatus.style.display = 'none';
+        return;
+    }
+
+    tiersValue.textContent = prizeTiers.map((tier, index) => {
+        const mark = index < currentTier ? '✅' : (index === currentTier ? '▶' : '');
+        return `${mark} ${tier.name}${tier.prize ? ' (' + tier.prize + ')' : ''}`.trim();
+    }).join(' · ');
+    tiersStatus.style.display = 'block';
+}
+
+function updatePrizeDisplay(prize) {
+    const prizeStatus = document.getElementById('prizeStatus');
+    const prizeValue = document.getElementById('prizeValue');
+
+    if (prize && prize.trim() !== '') {
+        prizeValue.textContent = prize;
+        prizeStatus.style.display = 'block';
+    } else {
+        prizeValue.textContent = '-';
+        prizeStatus.style.display = 'none';
+    }
+}
+
+function showWinnerModal(winner, message) {
+    document.getElementById('winnerText').textContent = winner === username ? 'VOCÊ GANHOU!' : 'BINGO!';
+    document.getElementById('winnerMessage').textContent = message;
+    document.getElementById('winnerModal').style.display = 'flex';
+}
+
+function closeWinnerModal() {
+    document.getElementById('winnerModal').style.display = 'none';
+}
+
+function resetGameDisplay() {
+    document.getElementById('drawnNumbers').innerHTML = '';
+    document.getElementById('lastNumberValue').textContent = '-';
+    document.getElementById('bingoCards').innerHTML = '';
+    document.getElementById('leaderboardList').innerHTML = '';
+    gameCards = [];
+    document.getElementById('cardsCount').textContent = '0';
+}
+
+function showNotification(message, type) {
+    const notifications = document.getElementById('notifications');
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.textContent = message;
+
+    notifications.appendChild(notification);
+
+    setTimeout(() => {
+        notification.remove();
+    }, 5000);
+}
+
+// Cleanup removido para evitar desconexões desnecessárias
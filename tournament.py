@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Torneios do Bingo da Golden Club
+
+Um torneio agrupa várias salas (eventos com 30-50 salas ao mesmo tempo) e
+sorteia os números de um único baralho embaralhado: todas as salas recebem
+as mesmas bolas, na mesma ordem. Cada bola é distribuída às salas em uma só
+passada e marcada pelo índice de números de cada sala (`Room.mark_number`),
+então o custo de uma bola é proporcional às cartelas que a contêm, não ao
+total de cartelas do torneio. Uma bola que a fila de uma sala não aceita
+fica guardada para ela e é entregue, na ordem, junto com o próximo sorteio:
+toda sala marca todas as bolas.
+
+As etapas conquistadas em cada sala entram em um quadro único de vencedores
+do torneio. O torneio termina quando todas as salas encerram o jogo ou o
+baralho acaba, ou quando o admin o cancela.
+"""
+
+import random
+import threading
+from datetime import datetime
+
+
+class Tournament:
+    def __init__(self, name, admin_username):
+        self.name = name
+        self.admin_username = admin_username
+        self.rooms = {}  # {room_name: Room} - salas do torneio, em ordem de inclusão
+        self.deck = random.sample(range(1, 76), 75)  # Baralho comum; a próxima bola sai do fim
+        self.numbers_drawn = []
+        self.winners = []  # Quadro de vencedores de todas as salas, em ordem de conquista
+        self.is_active = False
+        self.is_finished = False
+        self.cancelled = False
+        self.created_at = datetime.now()
+        self._pending = {}  # {contagem de bolas: salas que ainda não processaram a bola}
+        self._deferred = {}  # {room_name: [(bola, contagem)]} - bolas que a fila da sala não aceitou
+        self._lock = threading.Lock()
+
+    def add_room(self, room):
+        """Inclui uma sala no torneio; seus números passam a vir do baralho comum"""
+        with self._lock:
+            if self.is_active or self.is_finished:
+                return False
+            if room.tournament not in (None, self.name) or room.game_started:
+                return False
+            room.tournament = self.name
+            room.touch()
+            self.rooms[room.room_name] = room
+            return True
+
+    def release(self):
+        """Devolve o sorteio às salas (fim ou cancelamento do torneio)"""
+        for room in self.room_list():
+            self.release_room(room)
+
+    def release_room(self, room):
+        """Devolve o sorteio a uma sala do torneio"""
+        if room.tournament == self.name:
+            room.tournament = None
+            room.touch()
+
+    def cancel(self):
+        """Encerra o torneio antes do fim; retorna False se ele já terminou"""
+        with self._lock:
+            if self.is_finished:
+                return False
+            self.is_active = False
+            self.is_finished = True
+            self.cancelled = True
+            return True
+
+    def room_list(self):
+        """Cópia das salas do torneio (salas existentes entram pela fila delas)"""
+        with self._lock:
+            return list(self.rooms.values())
+
+    def start(self):
+        with self._lock:
+            self.is_active = True
+
+    def next_ball(self):
+        """Tira a próxima bola do baralho e retorna (bola, salas que devem marcá-la)"""
+        with self._lock:
+            if not self.is_active or not self.deck:
+                return None, []
+            # Salas ainda sem vencedor (as que estão iniciando marcam na ordem da fila da sala)
+            targets = [room for room in self.rooms.values() if room.winner is None]
+            if not targets:
+                return None, []
+            number = self.deck.pop()
+            self.numbers_drawn.append(number)
+            self._pending[len(self.numbers_drawn)] = len(targets)
+            return number, targets
+
+    def apply_ball(self, room, number, draw_count):
+        """Marca a bola em uma sala e registra as etapas conquistadas no quadro
+
+        Retorna (se a sala marcou a bola, etapas conquistadas, se esta foi a
+        última sala a processar a bola).
+        """
+        marked = False
+        claimed = []
+        try:
+            if room.is_active and room.call_number(number):
+                marked = True
+                room.mark_number(number)
+                claimed = room.evaluate_prizes()
+        finally:
+            with self._lock:
+                for tier in claimed:
+                    for winner in tier['winners']:
+                        self.winners.append({
+                            'room': room.room_name,
+                            'tier': tier['name'],
+                            'pattern': tier['pattern'],
+                            'prize': tier['prize'],
+                            'username': winner['username'],
+                            'card_index': winner['card_index'],
+                            'ball': number,
+                            'draw_count': draw_count
+                        })
+                last = self._ball_done(draw_count)
+        return marked, claimed, last
+
+    def take_balls(self, room, number=None, draw_count=None):
+        """Bolas a entregar à sala: as guardadas, em ordem, e a atual (se houver)"""
+        with self._lock:
+            balls = self._deferred.pop(room.room_name, [])
+        if number is not None:
+            balls.append((number, draw_count))
+        return balls
+
+    def defer_balls(self, room, balls):
+        """Guarda as bolas que a sala não pôde receber para o próximo sorteio"""
+        with self._lock:
+            self._deferred[room.room_name] = balls + self._deferred.get(room.room_name, [])
+
+    def deferred_rooms(self):
+        """Salas com bolas guardadas"""
+        with self._lock:
+            return [self.rooms[name] for name in self._deferred]
+
+    def _ball_done(self, draw_count):
+        self._pending[draw_count] -= 1
+        if self._pending[draw_count] > 0:
+            return False
+        del self._pending[draw_count]
+        if not self.deck or not any(room.is_active for room in self.rooms.values()):
+            self.is_active = False
+            self.is_finished = True
+        return True
+
+    def get_board(self):
+        """Quadro do torneio: bolas sorteadas, situação das salas e vencedores"""
+        with self._lock:
+            winners = list(self.winners)
+            rooms = list(self.rooms.values())
+        return {
+            'name': self.name,
+            'admin': self.admin_username,
+            'is_active': self.is_active,
+            'is_finished': self.is_finished,
+            'cancelled': self.cancelled,
+            'numbers_drawn': list(self.numbers_drawn),
+            'rooms': [{
+                'room_name': room.room_name,
+                'players_count': len(room.members),
+                'is_active': room.is_active,
+                'current_tier': room.current_tier,
+                'winner': room.winner
+            } for room in rooms],
+            'winners': winners
+        }
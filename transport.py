@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada de transporte dos eventos WebSocket do Bingo da Golden Club
+
+Os handlers de app.py usam estas funções (`emit`, `join_room`,
+`current_sid`...) em vez de chamar o Flask-SocketIO diretamente, para que
+o mesmo código rode nos dois modos de servidor:
+
+- WSGI (padrão): repassa tudo ao Flask-SocketIO, dentro do contexto da
+  requisição do evento.
+- ASGI (`BINGO_SERVER_MODE=asgi`, ver asgi.py): cada evento roda em uma
+  corrotina do `socketio.AsyncServer`. O handler enfileira as operações em
+  uma Outbox da conexão atual e a corrotina as envia com `await` ao final,
+  sem ocupar uma thread por cliente.
+"""
+
+import asyncio
+import contextvars
+
+import flask_socketio
+from flask import request, session
+
+_outbox = contextvars.ContextVar('bingo_outbox', default=None)
+
+
+class Outbox:
+    """Operações de saída de um evento no modo ASGI, enviadas em ordem"""
+
+    def __init__(self, sid, username):
+        self.sid = sid
+        self.username = username
+        self.ops = []  # [(método, argumentos)]
+
+    async def flush(self, sio):
+        for op, args in self.ops:
+            if op == 'emit':
+                event, data, to = args
+                await sio.emit(event, data, to=to or self.sid)
+            elif op == 'enter_room':
+                await sio.enter_room(self.sid, args)
+            elif op == 'leave_room':
+                await sio.leave_room(self.sid, args)
+            elif op == 'disconnect':
+                await sio.disconnect(self.sid)
+        self.ops = []
+
+
+def activate(outbox):
+    """Define a Outbox do evento em execução (modo ASGI)"""
+    return _outbox.set(outbox)
+
+
+def deactivate(token):
+    _outbox.reset(token)
+
+
+def current_sid():
+    """sid da conexão que disparou o evento"""
+    outbox = _outbox.get()
+    return outbox.sid if outbox is not None else request.sid
+
+
+def session_username():
+    """Usuário logado na conexão que disparou o evento"""
+    outbox = _outbox.get()
+    return outbox.username if outbox is not None else session.get('username')
+
+
+def emit(event, data, to=None):
+    """Envia um evento ao remetente, ou a uma sala/sid se `to` for informado"""
+    outbox = _outbox.get()
+    if outbox is not None:
+        outbox.ops.append(('emit', (event, data, to)))
+    elif to is None:
+        flask_socketio.emit(event, data)
+    else:
+        flask_socketio.emit(event, data, to=to)
+
+
+def join_room(room):
+    outbox = _outbox.get()
+    if outbox is not None:
+        outbox.ops.append(('enter_room', room))
+    else:
+        flask_socketio.join_room(room)
+
+
+def leave_room(room):
+    outbox = _outbox.get()
+    if outbox is not None:
+        outbox.ops.append(('leave_room', room))
+    else:
+        flask_socketio.leave_room(room)
+
+
+def disconnect():
+    outbox = _outbox.get()
+    if outbox is not None:
+        outbox.ops.append(('disconnect', None))
+    else:
+        flask_socketio.disconnect()
+
+
+class EventRegistry:
+    """Registra handlers no Flask-SocketIO e guarda-os para o modo ASGI"""
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+        self.handlers = {}  # {evento: handler}
+        self.async_mode = False  # Ativado por asgi.py
+        self.server = None  # socketio.AsyncServer no modo ASGI
+        self.loop = None  # Event loop do servidor no modo ASGI
+
+    def on(self, event):
+        def decorator(handler):
+            self.handlers[event] = handler
+            return self.socketio.on(event)(handler)
+        return decorator
+
+    def _run_async(self, coroutine):
+        """Agenda uma operação do servidor assíncrono a partir de outra thread"""
+        if self.loop is None:
+            coroutine.close()
+            print("[DEBUG] Event loop do modo ASGI ainda não iniciado; operação descartada")
+            return
+        asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def emit(self, event, data, to):
+        """Envia um evento fora de um handler (tarefas em segundo plano)"""
+        if self.async_mode:
+            self._run_async(self.server.emit(event, data, to=to))
+        else:
+            self.socketio.emit(event, data, to=to)
+
+    def enter_room(self, sid, room):
+        """Coloca uma conexão em uma sala fora de um handler"""
+        if self.async_mode:
+            self._run_async(self.server.enter_room(sid, room))
+        else:
+            self.socketio.server.enter_room(sid, room, namespace='/')
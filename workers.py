@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pool de tarefas do Bingo da Golden Club
+
+Operações pesadas das salas (distribuir cartelas, montar o estado de todas
+as cartelas a cada sorteio, gravar o histórico) saem dos handlers WebSocket
+e rodam aqui, para que uma sala iniciando um jogo não atrase os sorteios das
+outras. Há dois executores com fila limitada:
+
+- `io`: pool de threads para operações das salas, que alteram o estado em
+  memória, e para I/O (histórico, reabastecimento do pool de cartelas).
+- `cpu`: pool de processos para cálculo puro (blocos do simulador), criado
+  no primeiro uso.
+
+Tarefas de uma mesma sala (`submit_room`) rodam uma por vez, na ordem em que
+foram enviadas; salas diferentes rodam em paralelo. Cada tarefa de sala
+retorna as mensagens `(evento, dados, destino)` que são emitidas ao concluir.
+Tarefas de manutenção repetidas (`coalesce=True`, como o reabastecimento do
+pool de cartelas) são enviadas uma só vez enquanto a anterior ainda aguarda
+na fila da sala. `stats()` expõe a profundidade das filas.
+"""
+
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class PoolFull(Exception):
+    """A fila do executor (ou da sala) atingiu o limite"""
+
+
+class BoundedExecutor:
+    """Executor com limite de tarefas pendentes e contadores para métricas"""
+
+    def __init__(self, name, executor, workers, max_pending):
+        self.name = name
+        self.executor = executor
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self.pending = 0  # Enviadas e ainda não concluídas (na fila ou rodando)
+        self.peak_pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        """Envia `fn(*args)`; levanta PoolFull se a fila estiver cheia"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolFull(self.name)
+            self.pending += 1
+            self.submitted += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            future = self.executor.submit(fn, *args)
+        except RuntimeError:
+            # Executor já encerrado (servidor desligando)
+            with self._lock:
+                self.pending -= 1
+                self.rejected += 1
+            raise PoolFull(self.name)
+        future.add_done_callback(self._done)
+        return future
+
+    def submit_batch(self, fn, args_list):
+        """Envia `fn(*args)` para cada item; tudo ou nada
+
+        Reserva a fila para o lote inteiro antes de enviar a primeira tarefa:
+        se não houver espaço para todas, levanta PoolFull sem enviar nenhuma.
+        """
+        args_list = list(args_list)
+        with self._lock:
+            if self.pending + len(args_list) > self.max_pending:
+                self.rejected += 1
+                raise PoolFull(self.name)
+            self.pending += len(args_list)
+            self.submitted += len(args_list)
+            self.peak_pending = max(self.peak_pending, self.pending)
+        futures = []
+        try:
+            for args in args_list:
+                futures.append(self.executor.submit(fn, *args))
+                futures[-1].add_done_callback(self._done)
+        except RuntimeError:
+            # Executor encerrado no meio do lote: cancela o que já foi enviado
+            for future in futures:
+                future.cancel()
+            with self._lock:
+                self.pending -= len(args_list) - len(futures)
+                self.rejected += 1
+            raise PoolFull(self.name)
+        return futures
+
+    def _done(self, future):
+        with self._lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'queued': max(0, self.pending - self.workers),
+                'peak_pending': self.peak_pending,
+                'max_pending': self.max_pending,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+class WorkerPool:
+    def __init__(self, emit, io_workers=8, cpu_workers=None, max_pending=256, max_room_pending=128):
+        self.emit = emit  # emit(evento, dados, destino), usado fora dos handlers
+        self.io = BoundedExecutor('io', ThreadPoolExecutor(io_workers, thread_name_prefix='bingo-io'),
+                                  io_workers, max_pending)
+        self.cpu_workers = cpu_workers
+        self.max_pending = max_pending
+        self.max_room_pending = max_room_pending  # Folga para uma sala lotada entrar de uma vez
+        self._cpu = None
+        self._lock = threading.Lock()
+        self._rooms = {}  # {room_name: deque de tarefas aguardando a anterior}
+
+    @property
+    def cpu(self):
+        """Pool de processos, criado no primeiro uso"""
+        with self._lock:
+            if self._cpu is None:
+                workers = self.cpu_workers or os.cpu_count() or 1
+                self._cpu = BoundedExecutor('cpu', ProcessPoolExecutor(max_workers=workers),
+                                            workers, self.max_pending)
+            return self._cpu
+
+    def submit_room(self, room_name, fn, *args, on_error=None, coalesce=False):
+        """Enfileira `fn(*args)` na sala e emite as mensagens que ela retornar
+
+        Tarefas da mesma sala rodam em ordem, uma de cada vez. `on_error` são as
+        mensagens emitidas se a tarefa falhar. Com `coalesce`, a tarefa é
+        ignorada se a mesma função já aguarda na fila da sala. Levanta PoolFull
+        se a sala ou o pool estiverem com a fila cheia.
+        """
+        task = (fn, args, on_error)
+        with self._lock:
+            waiting = self._rooms.get(room_name)
+            if waiting is not None:
+                if coalesce and any(queued[0] is fn for queued in waiting):
+                    return
+                # Sala ocupada: roda quando a tarefa anterior terminar
+                if len(waiting) >= self.max_room_pending:
+                    raise PoolFull(room_name)
+                waiting.append(task)
+                return
+            self._rooms[room_name] = deque()
+
+        try:
+            self._start(room_name, task)
+        except PoolFull:
+            with self._lock:
+                self._rooms.pop(room_name, None)
+            raise
+
+    def _start(self, room_name, task):
+        fn, args, _ = task
+        future = self.io.submit(fn, *args)
+        future.add_done_callback(lambda f: self._finish(room_name, task, f))
+
+    def _finish(self, room_name, task, future):
+        """Emite o resultado da tarefa e libera a próxima da mesma sala"""
+        while True:
+            try:
+                messages = future.result()
+            except Exception as e:
+                print(f"[DEBUG] Falha em tarefa da sala {room_name}: {e!r}")
+                messages = task[2]
+            for event, data, to in messages or ():
+                try:
+                    self.emit(event, data, to)
+                except Exception as e:
+                    # Um envio com falha não pode travar a fila da sala
+                    print(f"[DEBUG] Falha ao enviar {event} da sala {room_name}: {e!r}")
+
+            with self._lock:
+                waiting = self._rooms[room_name]
+                if not waiting:
+                    del self._rooms[room_name]
+                    return
+                task = waiting.popleft()
+            try:
+                self._start(room_name, task)
+                return
+            except PoolFull as e:
+                # Pool cheio: a tarefa é descartada e a sala segue para a próxima
+                future = _failed_future(e)
+
+    def stats(self):
+        """Profundidade das filas e contadores dos executores"""
+        with self._lock:
+            rooms = {name: len(waiting) + 1 for name, waiting in self._rooms.items()}
+            cpu = self._cpu
+        return {
+            'io': self.io.stats(),
+            'cpu': cpu.stats() if cpu is not None else None,
+            'rooms_busy': len(rooms),
+            'room_pending': rooms
+        }
+
+    def shutdown(self, wait=True):
+        self.io.shutdown(wait=wait)
+        if self._cpu is not None:
+            self._cpu.shutdown(wait=wait)
+
+
+def _failed_future(exc):
+    future = Future()
+    future.set_exception(exc)
+    return future